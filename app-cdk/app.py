@@ -4,36 +4,123 @@ import os
 import aws_cdk as cdk
 
 from app_cdk.app_cdk_stack import AppCdkStack
+from app_cdk.artifact_replication_cdk_stack import ArtifactReplicationCdkStack
 from app_cdk.pipeline_cdk_stack import PipelineCdkStack
 from app_cdk.ecr_cdk_stack import EcrCdkStack
+from app_cdk.network_cdk_stack import NetworkCdkStack
+from app_cdk.performance_guardrails import GuardrailRules, PerformanceGuardrails
+from app_cdk.service_profile import CONTAINER_INSIGHTS, load_profile
 
 app = cdk.App()
 
+# The first region is home to the pipeline, the ECR source repository and the
+# test environment; production is deployed to every region, in waves.
+regions = app.node.try_get_context('deployment-regions') or [os.environ.get('CDK_DEFAULT_REGION')]
+if isinstance(regions, str):
+    # -c deployment-regions=us-east-2,eu-west-1
+    regions = regions.split(',')
+home_region = regions[0]
+replica_regions = regions[1:]
+multi_region = len(regions) > 1
+
+
+def environment(region):
+    # Single-region apps stay environment-agnostic, as they always were
+    if not multi_region:
+        return None
+    return cdk.Environment(account = os.environ['CDK_DEFAULT_ACCOUNT'], region = region)
+
+
+def stack_id(name, region):
+    return name if region == home_region else f'{name}-{region}'
+
+
 ecr_stack = EcrCdkStack(
     app,
-    'ecr-stack'
+    'ecr-stack',
+    replication_regions = replica_regions,
+    env = environment(home_region)
 )
 
+# Pin the image cdk deploy registers, e.g. -c image-tag=commit-<sha> to roll back;
+# the pipeline itself always deploys by digest.
+image_tag = app.node.try_get_context('image-tag') or 'latest'
+
+test_profile = load_profile(app, 'test')
+prod_profile = load_profile(app, 'prod')
+
+network_stacks = {}
+
+
+def shared_cluster(profile, region):
+    if not profile.shared_network:
+        return None
+    if region not in network_stacks:
+        network_stacks[region] = NetworkCdkStack(
+            app,
+            stack_id('network-stack', region),
+            vpc_endpoints = test_profile.vpc_endpoints or prod_profile.vpc_endpoints,
+            container_insights = max(
+                test_profile.container_insights,
+                prod_profile.container_insights,
+                key = CONTAINER_INSIGHTS.index
+            ),
+            env = environment(region)
+        )
+    return network_stacks[region].cluster_data
+
+
 test_app_stack = AppCdkStack(
     app,
     'test-app-stack',
-    ecr_repository = ecr_stack.ecr_data
+    ecr_repository = ecr_stack.ecr_data,
+    profile = test_profile,
+    cluster = shared_cluster(test_profile, home_region),
+    image_tag = image_tag,
+    env = environment(home_region)
 )
 
-prod_app_stack = AppCdkStack(
-    app,
-    'prod-app-stack',
-    ecr_repository = ecr_stack.ecr_data
-)
+prod_app_stacks = {
+    region: AppCdkStack(
+        app,
+        stack_id('prod-app-stack', region),
+        ecr_repository = ecr_stack.ecr_data,
+        profile = prod_profile,
+        cluster = shared_cluster(prod_profile, region),
+        image_tag = image_tag,
+        env = environment(region)
+    )
+    for region in regions
+}
+
+prod_deployment_waves = [[prod_app_stacks[home_region].deployment_group_data]]
+if replica_regions:
+    prod_deployment_waves.append([prod_app_stacks[region].deployment_group_data for region in replica_regions])
+
+# Cross-region deploy actions read artifacts from a bucket in their own region
+replication_buckets = {
+    region: ArtifactReplicationCdkStack(
+        app,
+        stack_id('artifact-replication-stack', region),
+        env = environment(region)
+    ).bucket_data
+    for region in replica_regions
+}
 
 pipeline_stack = PipelineCdkStack(
     app,
     'pipeline-stack',
     ecr_repository = ecr_stack.ecr_data,
+    cache_repository = ecr_stack.cache_data,
     test_app_fargate = test_app_stack.ecs_service_data,
-    prod_app_fargate = prod_app_stack.ecs_service_data,
-    green_target_group = prod_app_stack.green_target_group,
-    green_load_balancer_listener = prod_app_stack.green_load_balancer_listener,
+    prod_deployment_waves = prod_deployment_waves,
+    build_architecture = app.node.try_get_context('build-architecture') or 'X86_64',
+    notification_email = app.node.try_get_context('notification-email'),
+    cross_region_replication_buckets = replication_buckets or None,
+    env = environment(home_region)
 )
 
+# Flag performance anti-patterns in every stack at synth time
+cdk.Aspects.of(app).add(PerformanceGuardrails(GuardrailRules.from_context(app)))
+
 app.synth()
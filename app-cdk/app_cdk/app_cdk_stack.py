@@ -1,13 +1,26 @@
 from constructs import Construct
 from aws_cdk import (
     Stack,
+    CfnOutput,
     Duration,
-    aws_ec2 as ec2,
+    aws_codedeploy as codedeploy,
+    aws_ecr as ecr,
     aws_ecs as ecs,
     aws_ecs_patterns as ecs_patterns,
     aws_elasticloadbalancingv2 as elbv2,  
+    aws_route53 as route53,
+    aws_route53_targets as route53_targets,
 )
 
+from app_cdk.deployment_alarms import create_deployment_alarms
+from app_cdk.edge_cache import EdgeCache
+from app_cdk.service_dashboard import ServiceDashboard
+from app_cdk.service_logging import add_log_router, create_log_driver
+from app_cdk.service_profile import BlueGreenDeploymentProps, ServiceProfile
+from app_cdk.service_scaling import configure_service_scaling
+from app_cdk.traffic_hook import BeforeAllowTrafficHook
+from app_cdk.network_cdk_stack import create_network
+
 class AppCdkStack(Stack):
 
     @property
@@ -22,36 +35,137 @@ class AppCdkStack(Stack):
     def green_load_balancer_listener(self):
         return self.load_balancer_listener      
 
-    def __init__(self, scope: Construct, construct_id: str, ecr_repository, **kwargs) -> None:
+    @property
+    def distribution_data(self):
+        return self.distribution
+
+    @property
+    def deployment_group_data(self):
+        return self.deployment_group
+
+    @property
+    def dashboard_data(self):
+        return self.dashboard
+
+    def __init__(self, scope: Construct, construct_id: str, ecr_repository, profile: ServiceProfile, cluster: ecs.ICluster = None, image_tag: str = 'latest', **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
-        vpc = ec2.Vpc(
-            self, 'my-vpc'
+        if cluster is None:
+            # Isolated environment: the stack owns its VPC and cluster
+            vpc, ecs_cluster = create_network(
+                self,
+                vpc_endpoints = profile.vpc_endpoints,
+                container_insights = profile.container_insights
+            )
+        else:
+            vpc, ecs_cluster = cluster.vpc, cluster
+
+        if Stack.of(ecr_repository).region != self.region:
+            # Regional stacks pull the image ECR replicated into their own region
+            ecr_repository = ecr.Repository.from_repository_name(
+                self, 'replicated-repository',
+                ecr_repository.repository_name
+            )
+
+        deployment_controller = None
+        if profile.blue_green:
+            deployment_controller = ecs.DeploymentController(
+                type = ecs.DeploymentControllerType.CODE_DEPLOY
+            )
+
+        rolling_deployment = profile.rolling_deployment
+        circuit_breaker = None
+        if rolling_deployment is not None:
+            # Fails a deployment whose tasks never turn healthy instead of retrying forever
+            circuit_breaker = ecs.DeploymentCircuitBreaker(
+                enable = True,
+                rollback = rolling_deployment.circuit_breaker_rollback
+            )
+
+        capacity_provider_strategies = [
+            ecs.CapacityProviderStrategy(
+                capacity_provider = provider.capacity_provider,
+                weight = provider.weight,
+                base = provider.base
+            )
+            for provider in profile.capacity_providers
+        ] or None
+
+        log_driver, log_group = create_log_driver(self, profile.logging)
+
+        service = ecs_patterns.ApplicationLoadBalancedFargateService(
+            self, 'service',
+            cluster = ecs_cluster,
+            memory_limit_mib = profile.memory_limit_mib,
+            desired_count = profile.task_count,
+            cpu = profile.cpu,
+            task_image_options = ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
+                image=ecs.ContainerImage.from_ecr_repository(ecr_repository, tag = image_tag),
+                container_port = profile.container_port,
+                container_name = 'my-app',
+                log_driver = log_driver,
+                environment = {
+                    # Let gunicorn finish in-flight requests before ECS sends SIGKILL
+                    'GUNICORN_GRACEFUL_TIMEOUT': str(max(1, profile.stop_timeout_seconds - 5)),
+                    # Must outlast the ALB idle timeout so the ALB, not the task, closes idle connections
+                    'GUNICORN_KEEPALIVE': str(profile.load_balancer.target_keep_alive_seconds)
+                }
+            ),
+            deployment_controller = deployment_controller,
+            min_healthy_percent = rolling_deployment.min_healthy_percent if rolling_deployment else None,
+            max_healthy_percent = rolling_deployment.max_healthy_percent if rolling_deployment else None,
+            circuit_breaker = circuit_breaker,
+            capacity_provider_strategies = capacity_provider_strategies,
+            runtime_platform = ecs.RuntimePlatform(
+                cpu_architecture = getattr(ecs.CpuArchitecture, profile.cpu_architecture),
+                operating_system_family = ecs.OperatingSystemFamily.LINUX
+            )
         )
 
-        ecs_cluster = ecs.Cluster(
-            self, 'ecs-cluster',
-            vpc = vpc
+        # On a Fargate Spot interruption ECS deregisters the task from the target
+        # group and sends SIGTERM; the stop timeout bounds how long it may drain.
+        service.task_definition.node.default_child.add_property_override(
+            'ContainerDefinitions.0.StopTimeout',
+            profile.stop_timeout_seconds
         )
 
-        if construct_id == "prod-app-stack":
-            # Prod service definition
-            service = ecs_patterns.ApplicationLoadBalancedFargateService(
-                self, 'service',
-                cluster = ecs_cluster,
-                memory_limit_mib = 1024,
-                desired_count = 1,
-                cpu = 512,
-                task_image_options = ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
-                    image=ecs.ContainerImage.from_ecr_repository(ecr_repository),
-                    container_port = 8081,
-                    container_name = 'my-app'
-                ),
-                deployment_controller = ecs.DeploymentController(
-                    type = ecs.DeploymentControllerType.CODE_DEPLOY
-                )    
+        if profile.logging.driver == 'firelens':
+            add_log_router(
+                service.task_definition,
+                profile.logging,
+                log_group,
+                cpu_architecture = profile.cpu_architecture
             )
 
+        # Container-level health check: ECS replaces a wedged task without waiting
+        # for the load balancer, and the start period covers measured startup.
+        container_health_check = profile.container_health_check
+        service.task_definition.node.default_child.add_property_override(
+            'ContainerDefinitions.0.HealthCheck',
+            {
+                'Command': [
+                    'CMD-SHELL',
+                    f'wget -q -O /dev/null http://localhost:{profile.container_port}{container_health_check.path} || exit 1'
+                ],
+                'Interval': container_health_check.interval_seconds,
+                'Timeout': container_health_check.timeout_seconds,
+                'Retries': container_health_check.retries,
+                'StartPeriod': container_health_check.effective_start_period_seconds
+            }
+        )
+
+        load_balancer_props = profile.load_balancer
+        service.load_balancer.set_attribute('idle_timeout.timeout_seconds', str(load_balancer_props.idle_timeout_seconds))
+        service.load_balancer.set_attribute('client_keep_alive.seconds', str(load_balancer_props.client_keep_alive_seconds))
+        service.load_balancer.set_attribute('routing.http2.enabled', str(load_balancer_props.http2_enabled).lower())
+
+        target_groups = [service.target_group]
+
+        self.target_group = None
+        self.load_balancer_listener = None
+        self.deployment_group = None
+
+        if profile.blue_green:
             green_load_balancer_listener=service.load_balancer.add_listener(
                 'green_load_balancer_listener',
                 port = 81,
@@ -70,31 +184,108 @@ class AppCdkStack(Stack):
                 target_groups = [green_target_group]
             )
 
+            target_groups.append(green_target_group)
+
             self.target_group = green_target_group
             self.load_balancer_listener = green_load_balancer_listener
 
-        else:
-            # Test service definition
-            service = ecs_patterns.ApplicationLoadBalancedFargateService(
-                self, 'service',
-                cluster = ecs_cluster,
-                memory_limit_mib = 1024,
-                desired_count = 1,
-                cpu = 512,
-                task_image_options = ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
-                    image=ecs.ContainerImage.from_ecr_repository(ecr_repository),
-                    container_port = 8081,
-                    container_name = 'my-app'
+            blue_green_props = profile.blue_green_deployment or BlueGreenDeploymentProps()
+
+            # The deployment group has to live in the service's region, so each
+            # regional blue/green stack owns its own.
+            self.deployment_group = codedeploy.EcsDeploymentGroup(
+                self, 'my-app-dg',
+                service = service.service,
+                blue_green_deployment_config = codedeploy.EcsBlueGreenDeploymentConfig(
+                    blue_target_group = service.target_group,
+                    green_target_group = green_target_group,
+                    listener = service.listener,
+                    test_listener = green_load_balancer_listener
+                ),
+                deployment_config = getattr(codedeploy.EcsDeploymentConfig, blue_green_props.deployment_config),
+                application = codedeploy.EcsApplication(self, 'my-app'),
+                # A slow or failing canary is rolled back before traffic moves further
+                alarms = create_deployment_alarms(self, target_groups, blue_green_props),
+                auto_rollback = codedeploy.AutoRollbackConfig(
+                    failed_deployment = True,
+                    stopped_deployment = True,
+                    deployment_in_alarm = True
                 )
             )
 
-        service.target_group.configure_health_check(
-            healthy_threshold_count = 2,
-            unhealthy_threshold_count = 2,
-            timeout = Duration.seconds(10),
-            interval = Duration.seconds(11)
-        )
+            # Registered in the generated appspec.yaml; CodeDeploy invokes it in the service's region
+            BeforeAllowTrafficHook(
+                self, 'before-allow-traffic',
+                load_balancer = service.load_balancer,
+                deployment_group = self.deployment_group
+            )
+
+        # CodeDeploy moves production traffic to whichever target group holds the
+        # replacement tasks, so blue and green must be tuned identically.
+        for target_group in target_groups:
+            target_group.configure_health_check(
+                path = profile.health_check.path,
+                healthy_threshold_count = profile.health_check.healthy_threshold_count,
+                unhealthy_threshold_count = profile.health_check.unhealthy_threshold_count,
+                timeout = Duration.seconds(profile.health_check.timeout_seconds),
+                interval = Duration.seconds(profile.health_check.interval_seconds)
+            )
 
-        service.target_group.set_attribute('deregistration_delay.timeout_seconds', '5')
+            target_group.set_attribute(
+                'deregistration_delay.timeout_seconds',
+                str(profile.deregistration_delay_seconds)
+            )
+            target_group.set_attribute('load_balancing.algorithm.type', load_balancer_props.routing_algorithm)
+            if load_balancer_props.slow_start_seconds:
+                target_group.set_attribute('slow_start.duration_seconds', str(load_balancer_props.slow_start_seconds))
+
+        if profile.scaling is not None:
+            configure_service_scaling(
+                service,
+                profile.scaling,
+                blue_green = profile.blue_green
+            )
+
+        self.dashboard = None
+        if profile.dashboard.enabled:
+            self.dashboard = ServiceDashboard(
+                self, 'dashboard',
+                environment_name = construct_id,
+                service = service,
+                target_groups = target_groups,
+                props = profile.dashboard,
+                # A cluster passed in may not have Container Insights, whatever the profile says
+                container_insights = cluster is None and profile.container_insights != 'DISABLED'
+            ).dashboard_data
+
+        self.distribution = None
+        if profile.edge_cache.enabled:
+            self.distribution = EdgeCache(
+                self, 'edge-cache',
+                load_balancer = service.load_balancer,
+                props = profile.edge_cache
+            ).distribution_data
+
+            CfnOutput(
+                self, 'DistributionDomainName',
+                value = self.distribution.distribution_domain_name
+            )
+
+        if profile.dns is not None:
+            # Latency-based alias: Route 53 answers with the region closest to the user
+            route53.ARecord(
+                self, 'latency-record',
+                zone = route53.HostedZone.from_hosted_zone_attributes(
+                    self, 'hosted-zone',
+                    hosted_zone_id = profile.dns.hosted_zone_id,
+                    zone_name = profile.dns.zone_name
+                ),
+                record_name = profile.dns.record_name,
+                target = route53.RecordTarget.from_alias(
+                    route53_targets.LoadBalancerTarget(service.load_balancer)
+                ),
+                region = self.region,
+                set_identifier = f'{construct_id}-{self.region}'
+            )
 
         self.service = service
\ No newline at end of file
@@ -0,0 +1,39 @@
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    Stack,
+    PhysicalName,
+    RemovalPolicy,
+    aws_s3 as s3,
+)
+
+
+class ArtifactReplicationCdkStack(Stack):
+    """Holds the bucket CodePipeline copies artifacts into for one replica region.
+
+    Left to itself, CDK would put this bucket in the regional app stack the
+    cross-region action deploys to, and grant it to an action role in
+    pipeline-stack. The two stacks would then reference each other. Keeping
+    the bucket in its own stack leaves one dependency: pipeline-stack
+    depends on it.
+    """
+
+    @property
+    def bucket_data(self):
+        return self.bucket
+
+    def __init__(self, scope: Construct, id: str, **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        self.bucket = s3.Bucket(
+            self, 'artifacts',
+            # Referenced by name from the pipeline in the home region
+            bucket_name = PhysicalName.GENERATE_IF_NEEDED,
+            encryption = s3.BucketEncryption.S3_MANAGED,
+            block_public_access = s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl = True,
+            removal_policy = RemovalPolicy.DESTROY,
+            auto_delete_objects = True,
+            # Replicated artifacts are only read while their pipeline run deploys
+            lifecycle_rules = [s3.LifecycleRule(expiration = Duration.days(30))]
+        )
\ No newline at end of file
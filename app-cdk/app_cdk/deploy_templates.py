@@ -0,0 +1,163 @@
+"""Generate the CodeDeploy ``taskdef.json`` and ``appspec.yaml`` for a blue/green stack.
+
+Both files are derived from the stack CDK deployed instead of being checked
+in, so CPU, memory, ports, runtime platform, logging and health checks tuned
+in ``AppCdkStack`` reach every blue/green deployment:
+
+1. ``task-definition-arn`` reads the stack template (``aws cloudformation
+   get-template``) and its resources (``aws cloudformation
+   describe-stack-resources``) and prints the ARN of the task definition CDK
+   registered.
+2. ``generate`` turns ``aws ecs describe-task-definition`` for that ARN into
+   a registrable ``taskdef.json`` whose service container image is the
+   ``<IMAGE1_NAME>`` placeholder (CodeDeploy substitutes the promoted digest)
+   and writes ``appspec.yaml`` with the service's load balancer target and
+   every Lambda tagged ``codedeploy-hook``.
+
+Usage:
+  python app-cdk/app_cdk/deploy_templates.py task-definition-arn template.json resources.json
+  python app-cdk/app_cdk/deploy_templates.py generate template.json task-definition.json --output-dir deploy/prod-app-stack
+"""
+import argparse
+import json
+import os
+
+IMAGE_PLACEHOLDER = '<IMAGE1_NAME>'
+TASK_DEFINITION_PLACEHOLDER = '<TASK_DEFINITION>'
+HOOK_TAG = 'codedeploy-hook'
+
+# describe-task-definition fields that register-task-definition rejects
+READ_ONLY_FIELDS = (
+    'taskDefinitionArn',
+    'revision',
+    'status',
+    'requiresAttributes',
+    'compatibilities',
+    'registeredAt',
+    'registeredBy',
+    'deregisteredAt',
+)
+
+
+def _resources(template, resource_type):
+    return {
+        logical_id: resource
+        for logical_id, resource in template.get('Resources', {}).items()
+        if resource.get('Type') == resource_type
+    }
+
+
+def find_blue_green_service(template):
+    services = {
+        logical_id: resource
+        for logical_id, resource in _resources(template, 'AWS::ECS::Service').items()
+        if resource.get('Properties', {}).get('DeploymentController', {}).get('Type') == 'CODE_DEPLOY'
+    }
+    if len(services) != 1:
+        raise ValueError(f'expected one CODE_DEPLOY service in the template, found {len(services)}')
+    return next(iter(services.items()))
+
+
+def task_definition_logical_id(template):
+    _, service = find_blue_green_service(template)
+    reference = service['Properties']['TaskDefinition']
+    if not isinstance(reference, dict) or 'Ref' not in reference:
+        raise ValueError('the service does not reference a task definition in the same stack')
+    return reference['Ref']
+
+
+def load_balancer_target(template):
+    _, service = find_blue_green_service(template)
+    target = service['Properties']['LoadBalancers'][0]
+    return target['ContainerName'], target['ContainerPort']
+
+
+def hook_functions(template):
+    hooks = {}
+    for function in _resources(template, 'AWS::Lambda::Function').values():
+        properties = function.get('Properties', {})
+        for tag in properties.get('Tags', []):
+            if tag.get('Key') == HOOK_TAG:
+                hooks[tag['Value']] = properties['FunctionName']
+    return hooks
+
+
+def physical_id(stack_resources, logical_id):
+    for resource in stack_resources.get('StackResources', stack_resources):
+        if resource['LogicalResourceId'] == logical_id:
+            return resource['PhysicalResourceId']
+    raise ValueError(f'{logical_id} is not a resource of the deployed stack')
+
+
+def task_definition_document(described, container_name, image = IMAGE_PLACEHOLDER):
+    task_definition = dict(described.get('taskDefinition', described))
+    for field in READ_ONLY_FIELDS:
+        task_definition.pop(field, None)
+
+    containers = []
+    for container in task_definition['containerDefinitions']:
+        if container['name'] == container_name:
+            container = {**container, 'image': image}
+        containers.append(container)
+    task_definition['containerDefinitions'] = containers
+    return task_definition
+
+
+def appspec_document(container_name, container_port, hooks = None):
+    appspec = {
+        'version': 0.0,
+        'Resources': [{
+            'TargetService': {
+                'Type': 'AWS::ECS::Service',
+                'Properties': {
+                    'TaskDefinition': TASK_DEFINITION_PLACEHOLDER,
+                    'LoadBalancerInfo': {
+                        'ContainerName': container_name,
+                        'ContainerPort': container_port,
+                    },
+                },
+            },
+        }],
+    }
+    if hooks:
+        appspec['Hooks'] = [{event: function_name} for event, function_name in sorted(hooks.items())]
+    return appspec
+
+
+def _load_json(path):
+    with open(path) as document:
+        return json.load(document)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Generate CodeDeploy deploy templates from a deployed stack.')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    arn_command = commands.add_parser('task-definition-arn', help = 'print the task definition ARN CDK registered')
+    arn_command.add_argument('template', help = 'aws cloudformation get-template --query TemplateBody output')
+    arn_command.add_argument('resources', help = 'aws cloudformation describe-stack-resources output')
+
+    generate_command = commands.add_parser('generate', help = 'write taskdef.json and appspec.yaml')
+    generate_command.add_argument('template', help = 'aws cloudformation get-template --query TemplateBody output')
+    generate_command.add_argument('task_definition', help = 'aws ecs describe-task-definition output')
+    generate_command.add_argument('--output-dir', default = '.')
+    generate_command.add_argument('--image', default = IMAGE_PLACEHOLDER,
+                                  help = 'image for the service container; defaults to the CodeDeploy placeholder')
+    args = parser.parse_args(argv)
+
+    template = _load_json(args.template)
+    if args.command == 'task-definition-arn':
+        print(physical_id(_load_json(args.resources), task_definition_logical_id(template)))
+        return
+
+    container_name, container_port = load_balancer_target(template)
+    os.makedirs(args.output_dir, exist_ok = True)
+    with open(os.path.join(args.output_dir, 'taskdef.json'), 'w') as output:
+        json.dump(task_definition_document(_load_json(args.task_definition), container_name, args.image), output, indent = 4)
+    # JSON is valid YAML, and CodeDeploy accepts either
+    with open(os.path.join(args.output_dir, 'appspec.yaml'), 'w') as output:
+        json.dump(appspec_document(container_name, container_port, hook_functions(template)), output, indent = 2)
+
+
+if __name__ == '__main__':
+    main()
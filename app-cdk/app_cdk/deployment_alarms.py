@@ -0,0 +1,55 @@
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    aws_cloudwatch as cloudwatch,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+
+from app_cdk.service_profile import BlueGreenDeploymentProps
+
+
+def create_deployment_alarms(scope: Construct, target_groups, props: BlueGreenDeploymentProps):
+    """Latency and 5xx alarms for every target group of a blue/green service.
+
+    CodeDeploy alternates which target group receives the replacement tasks,
+    so both are watched; during a canary only the new tasks feed the
+    replacement group's metrics.
+    """
+    alarms = []
+    for index, target_group in enumerate(target_groups):
+        colour = 'blue' if index == 0 else 'green'
+
+        alarms.append(cloudwatch.Alarm(
+            scope, f'{colour}-p99-latency-alarm',
+            alarm_description = f'p99 response time of the {colour} target group',
+            metric = target_group.metrics.target_response_time(
+                statistic = 'p99',
+                period = Duration.minutes(1)
+            ),
+            threshold = props.p99_latency_threshold_seconds,
+            evaluation_periods = props.alarm_evaluation_periods,
+            comparison_operator = cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data = cloudwatch.TreatMissingData.NOT_BREACHING
+        ))
+
+        alarms.append(cloudwatch.Alarm(
+            scope, f'{colour}-5xx-rate-alarm',
+            alarm_description = f'Percentage of 5xx responses from the {colour} target group',
+            metric = cloudwatch.MathExpression(
+                expression = '100 * FILL(errors, 0) / requests',
+                using_metrics = {
+                    'errors': target_group.metrics.http_code_target(
+                        elbv2.HttpCodeTarget.TARGET_5XX_COUNT,
+                        period = Duration.minutes(1)
+                    ),
+                    'requests': target_group.metrics.request_count(period = Duration.minutes(1))
+                },
+                period = Duration.minutes(1)
+            ),
+            threshold = props.error_rate_threshold_percent,
+            evaluation_periods = props.alarm_evaluation_periods,
+            comparison_operator = cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data = cloudwatch.TreatMissingData.NOT_BREACHING
+        ))
+
+    return alarms
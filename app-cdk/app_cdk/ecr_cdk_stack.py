@@ -1,6 +1,8 @@
 from constructs import Construct
 from aws_cdk import (
+    Duration,
     Stack,
+    PhysicalName,
     aws_ecr as ecr,
     RemovalPolicy
 )
@@ -11,12 +13,60 @@ class EcrCdkStack(Stack):
     def ecr_data(self):
         return self.ecr
 
-    def __init__(self, scope: Construct, id: str, **kwargs) -> None:
+    @property
+    def cache_data(self):
+        return self.cache
+
+    def __init__(self, scope: Construct, id: str, replication_regions = (), **kwargs) -> None:
         super().__init__(scope, id, **kwargs)
 
+        # No lifecycle rule expires untagged images here: SOCI lazy-loading
+        # indexes are stored as untagged artifacts next to the image they index.
         ecr_repository = ecr.Repository(
             self, 'my-app',
+            # Regional app stacks import the replica by name
+            repository_name = PhysicalName.GENERATE_IF_NEEDED if replication_regions else None,
             removal_policy = RemovalPolicy.DESTROY
         )
 
-        self.ecr = ecr_repository
\ No newline at end of file
+        if replication_regions:
+            # Replication is a registry-wide setting, scoped here to this repository
+            ecr.CfnReplicationConfiguration(
+                self, 'replication',
+                replication_configuration = ecr.CfnReplicationConfiguration.ReplicationConfigurationProperty(
+                    rules = [
+                        ecr.CfnReplicationConfiguration.ReplicationRuleProperty(
+                            destinations = [
+                                ecr.CfnReplicationConfiguration.ReplicationDestinationProperty(
+                                    region = region,
+                                    registry_id = self.account
+                                )
+                                for region in replication_regions
+                            ],
+                            repository_filters = [
+                                ecr.CfnReplicationConfiguration.RepositoryFilterProperty(
+                                    filter = ecr_repository.repository_name,
+                                    filter_type = 'PREFIX_MATCH'
+                                )
+                            ]
+                        )
+                    ]
+                )
+            )
+
+        # BuildKit layer cache for Docker-Build, exported as an OCI image so ECR
+        # accepts it. It is never deployed or replicated.
+        cache_repository = ecr.Repository(
+            self, 'build-cache',
+            removal_policy = RemovalPolicy.DESTROY,
+            empty_on_delete = True,
+            lifecycle_rules = [
+                ecr.LifecycleRule(
+                    tag_status = ecr.TagStatus.UNTAGGED,
+                    max_image_age = Duration.days(7)
+                )
+            ]
+        )
+
+        self.ecr = ecr_repository
+        self.cache = cache_repository
\ No newline at end of file
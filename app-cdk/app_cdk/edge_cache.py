@@ -0,0 +1,63 @@
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    Stack,
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+
+from app_cdk.service_profile import EdgeCacheProps
+
+
+class EdgeCache(Construct):
+
+    @property
+    def distribution_data(self):
+        return self.distribution
+
+    def __init__(self, scope: Construct, id: str, load_balancer: elbv2.IApplicationLoadBalancer, props: EdgeCacheProps, **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        # The origin decides what is cacheable through Cache-Control; the
+        # default TTL only applies to responses that carry no caching headers.
+        cache_policy = cloudfront.CachePolicy(
+            self, 'cache-policy',
+            comment = 'Honours origin Cache-Control and revalidates with ETag',
+            min_ttl = Duration.seconds(0),
+            default_ttl = Duration.seconds(props.default_ttl_seconds),
+            max_ttl = Duration.seconds(props.max_ttl_seconds),
+            query_string_behavior = cloudfront.CacheQueryStringBehavior.all(),
+            header_behavior = cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior = cloudfront.CacheCookieBehavior.none(),
+            enable_accept_encoding_gzip = True,
+            enable_accept_encoding_brotli = True
+        )
+
+        origin = origins.LoadBalancerV2Origin(
+            load_balancer,
+            protocol_policy = cloudfront.OriginProtocolPolicy.HTTP_ONLY,
+            origin_shield_enabled = props.origin_shield,
+            origin_shield_region = (props.origin_shield_region or Stack.of(self).region) if props.origin_shield else None
+        )
+
+        self.distribution = cloudfront.Distribution(
+            self, 'distribution',
+            comment = f'{Stack.of(self).stack_name} edge cache',
+            price_class = getattr(cloudfront.PriceClass, props.price_class),
+            default_behavior = cloudfront.BehaviorOptions(
+                origin = origin,
+                cache_policy = cache_policy,
+                compress = True,
+                allowed_methods = cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+                viewer_protocol_policy = cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+            ),
+            additional_behaviors = {
+                '/healthcheck': cloudfront.BehaviorOptions(
+                    origin = origin,
+                    cache_policy = cloudfront.CachePolicy.CACHING_DISABLED,
+                    allowed_methods = cloudfront.AllowedMethods.ALLOW_GET_HEAD,
+                    viewer_protocol_policy = cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                )
+            }
+        )
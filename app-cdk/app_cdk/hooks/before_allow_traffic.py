@@ -0,0 +1,132 @@
+"""CodeDeploy BeforeAllowTraffic hook for the blue/green ECS service.
+
+Until traffic shifts, the test listener (port 81) already routes to the
+green tasks and the production listener (port 80) still routes to blue.
+The hook warms green through the test listener, then samples both
+listeners alternately. It fails the deployment when green's p90 is slower
+than blue's by more than the allowed slowdown. If the Lambda is about to
+time out before it has a verdict, it reports Failed instead.
+"""
+import math
+import os
+import time
+import urllib.error
+import urllib.request
+
+# Left for the last request to time out (timed_get) and the status report
+REPORT_MARGIN_SECONDS = 15
+
+
+class OutOfTime(Exception):
+    """The remaining time is needed to report a status to CodeDeploy."""
+
+
+def check_deadline(deadline, clock = time.monotonic):
+    if deadline is not None and clock() >= deadline:
+        raise OutOfTime()
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def timed_get(url, timeout = 5):
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout = timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, (time.perf_counter() - started) * 1000
+
+
+def warm_up(base_url, paths, requests_per_path, get = timed_get, deadline = None, clock = time.monotonic):
+    errors = 0
+    for _ in range(requests_per_path):
+        for path in paths:
+            check_deadline(deadline, clock)
+            status, _ = get(base_url + path)
+            if status is None or status >= 500:
+                errors += 1
+    return errors
+
+
+def sample(blue_url, green_url, paths, samples_per_path, get = timed_get, deadline = None, clock = time.monotonic):
+    # Alternating the two listeners keeps transient network noise from favouring either
+    latencies = {'blue': [], 'green': []}
+    errors = {'blue': 0, 'green': 0}
+    for _ in range(samples_per_path):
+        for path in paths:
+            for colour, base_url in (('green', green_url), ('blue', blue_url)):
+                check_deadline(deadline, clock)
+                status, elapsed_ms = get(base_url + path)
+                if status is None or status >= 500:
+                    errors[colour] += 1
+                else:
+                    latencies[colour].append(elapsed_ms)
+    return latencies, errors
+
+
+def compare_latency(blue_ms, green_ms, max_slowdown, min_delta_ms):
+    blue_p90 = percentile(blue_ms, 0.90)
+    green_p90 = percentile(green_ms, 0.90)
+    summary = {'blue_p90_ms': blue_p90, 'green_p90_ms': green_p90}
+    if green_p90 is None:
+        return False, summary
+    if blue_p90 is None:
+        # Nothing to compare against, e.g. the very first deployment
+        return True, summary
+    # The absolute floor stops millisecond-level jitter on a fast page from failing a deploy
+    limit = max(blue_p90 * (1 + max_slowdown), blue_p90 + min_delta_ms)
+    summary['limit_ms'] = round(limit, 3)
+    return green_p90 <= limit, summary
+
+
+def evaluate(blue_url, green_url, paths, warmup_requests, samples, max_slowdown, min_delta_ms, get = timed_get, deadline = None, clock = time.monotonic):
+    warmup_errors = warm_up(green_url, paths, warmup_requests, get, deadline, clock)
+    latencies, errors = sample(blue_url, green_url, paths, samples, get, deadline, clock)
+    passed, summary = compare_latency(latencies['blue'], latencies['green'], max_slowdown, min_delta_ms)
+    summary['warmup_errors'] = warmup_errors
+    summary['green_errors'] = errors['green']
+    return passed and errors['green'] == 0, summary
+
+
+def report_status(event, status):
+    import boto3
+
+    boto3.client('codedeploy').put_lifecycle_event_hook_execution_status(
+        deploymentId = event['DeploymentId'],
+        lifecycleEventHookExecutionId = event['LifecycleEventHookExecutionId'],
+        status = status
+    )
+
+
+def handler(event, context):
+    passed, summary = False, {}
+    deadline = time.monotonic() + context.get_remaining_time_in_millis() / 1000 - REPORT_MARGIN_SECONDS
+    try:
+        passed, summary = evaluate(
+            blue_url = os.environ['BLUE_URL'],
+            green_url = os.environ['GREEN_URL'],
+            paths = os.environ.get('WARMUP_PATHS', '/').split(','),
+            warmup_requests = int(os.environ.get('WARMUP_REQUESTS', '20')),
+            samples = int(os.environ.get('SAMPLE_REQUESTS', '20')),
+            max_slowdown = float(os.environ.get('MAX_SLOWDOWN', '0.25')),
+            min_delta_ms = float(os.environ.get('MIN_DELTA_MS', '10')),
+            deadline = deadline
+        )
+    except OutOfTime:
+        # Slow or unreachable listeners; green is not proven, so it does not get traffic
+        summary = {'timed_out': True}
+    finally:
+        # CodeDeploy waits for a status until the hook times out, so always send one
+        print({'passed': passed, **summary})
+        report_status(event, 'Succeeded' if passed else 'Failed')
+    return summary
@@ -0,0 +1,50 @@
+from constructs import Construct
+from aws_cdk import (
+    Stack,
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+)
+
+from app_cdk.vpc_endpoints import add_vpc_endpoints
+
+
+def create_network(scope: Construct, vpc_endpoints: bool = False, container_insights: str = 'DISABLED'):
+    vpc = ec2.Vpc(
+        scope, 'my-vpc'
+    )
+
+    if vpc_endpoints:
+        add_vpc_endpoints(vpc)
+
+    ecs_cluster = ecs.Cluster(
+        scope, 'ecs-cluster',
+        vpc = vpc,
+        enable_fargate_capacity_providers = True,
+        # Per-task CPU, memory and network metrics in CloudWatch
+        container_insights_v2 = getattr(ecs.ContainerInsights, container_insights)
+    )
+
+    return vpc, ecs_cluster
+
+
+class NetworkCdkStack(Stack):
+
+    @property
+    def vpc_data(self):
+        return self.vpc
+
+    @property
+    def cluster_data(self):
+        return self.cluster
+
+    def __init__(self, scope: Construct, id: str, vpc_endpoints: bool = False, container_insights: str = 'DISABLED', **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        vpc, ecs_cluster = create_network(
+            self,
+            vpc_endpoints = vpc_endpoints,
+            container_insights = container_insights
+        )
+
+        self.vpc = vpc
+        self.cluster = ecs_cluster
@@ -0,0 +1,114 @@
+import json
+from dataclasses import dataclass, fields
+
+import jsii
+from constructs import Construct, IConstruct
+from aws_cdk import (
+    Annotations,
+    IAspect,
+    Stack,
+    Token,
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_logs as logs,
+)
+
+GUARDRAILS_CONTEXT_KEY = 'performance-guardrails'
+SEVERITIES = ('error', 'warning', 'off')
+DEBUG_VARIABLES = ('FLASK_DEBUG', 'DEBUG')
+TRUTHY_VALUES = ('1', 'true', 'yes', 'on')
+
+
+@dataclass(frozen = True)
+class GuardrailRules:
+    # Each rule is reported as an error (fails cdk synth), a warning, or not at all
+    service_scaling: str = 'error'
+    debug_mode: str = 'error'
+    health_check_interval: str = 'warning'
+    max_health_check_interval_seconds: int = 15
+    log_retention: str = 'warning'
+    mutable_image_tag: str = 'warning'
+
+    def __post_init__(self):
+        for rule in ('service_scaling', 'debug_mode', 'health_check_interval', 'log_retention', 'mutable_image_tag'):
+            if getattr(self, rule) not in SEVERITIES:
+                raise ValueError(f'{rule} must be one of {", ".join(SEVERITIES)}')
+        if self.max_health_check_interval_seconds < 5:
+            raise ValueError('max_health_check_interval_seconds must be at least 5')
+
+    @classmethod
+    def from_context(cls, scope: Construct) -> 'GuardrailRules':
+        # -c performance-guardrails='{"mutable_image_tag": "off"}'
+        overrides = scope.node.try_get_context(GUARDRAILS_CONTEXT_KEY) or {}
+        if isinstance(overrides, str):
+            overrides = json.loads(overrides)
+        unknown = set(overrides) - {rule.name for rule in fields(cls)}
+        if unknown:
+            raise ValueError(f'unknown performance guardrail rules: {", ".join(sorted(unknown))}')
+        return cls(**overrides)
+
+
+def _value(mapping, key):
+    # Resolved L2 container definitions use camelCase keys, raw L1 ones PascalCase
+    return mapping.get(key, mapping.get(key[0].upper() + key[1:]))
+
+
+def _is_latest_tag(image) -> bool:
+    if isinstance(image, str):
+        repository, _, tag = image.rpartition(':')
+        return tag == 'latest' or '/' in tag or not repository
+    # ECR images resolve to an Fn::Join that ends in ":<tag>"
+    return ':latest"' in json.dumps(image)
+
+
+@jsii.implements(IAspect)
+class PerformanceGuardrails:
+
+    def __init__(self, rules: GuardrailRules = None) -> None:
+        self.rules = rules or GuardrailRules()
+
+    def visit(self, node: IConstruct) -> None:
+        if isinstance(node, ecs.BaseService):
+            self._check_service_scaling(node)
+        elif isinstance(node, ecs.CfnTaskDefinition):
+            self._check_containers(node)
+        elif isinstance(node, elbv2.CfnTargetGroup):
+            self._check_health_check_interval(node)
+        elif isinstance(node, logs.CfnLogGroup):
+            self._check_log_retention(node)
+
+    def _report(self, node: IConstruct, rule: str, message: str) -> None:
+        severity = getattr(self.rules, rule)
+        if severity == 'error':
+            Annotations.of(node).add_error(f'[{rule}] {message}')
+        elif severity == 'warning':
+            Annotations.of(node).add_warning_v2(f'performance-guardrails:{rule}', message)
+
+    def _check_service_scaling(self, service: ecs.BaseService) -> None:
+        # auto_scale_task_count() adds the scalable target as the 'TaskCount' child
+        if service.node.try_find_child('TaskCount') is None:
+            self._report(service, 'service_scaling', 'service has a fixed task count; add a scaling policy')
+
+    def _check_containers(self, task_definition: ecs.CfnTaskDefinition) -> None:
+        containers = Stack.of(task_definition).resolve(task_definition.container_definitions) or []
+        for container in containers:
+            name = _value(container, 'name')
+            for variable in _value(container, 'environment') or []:
+                if _value(variable, 'name') in DEBUG_VARIABLES and str(_value(variable, 'value')).lower() in TRUTHY_VALUES:
+                    self._report(task_definition, 'debug_mode', f'container {name} runs with {_value(variable, "name")} enabled')
+            if _is_latest_tag(_value(container, 'image')):
+                self._report(task_definition, 'mutable_image_tag', f'container {name} pulls the mutable "latest" tag; pin an immutable tag or digest')
+
+    def _check_health_check_interval(self, target_group: elbv2.CfnTargetGroup) -> None:
+        # L2 target groups set the interval lazily, so the raw property is a token
+        interval = Stack.of(target_group).resolve(target_group.health_check_interval_seconds)
+        if Token.is_unresolved(interval):
+            return
+        limit = self.rules.max_health_check_interval_seconds
+        # Unset means the ALB default of 30 seconds
+        if (interval or 30) > limit:
+            self._report(target_group, 'health_check_interval', f'health check interval of {interval or 30}s exceeds {limit}s and slows deployments and failover')
+
+    def _check_log_retention(self, log_group: logs.CfnLogGroup) -> None:
+        if log_group.retention_in_days is None:
+            self._report(log_group, 'log_retention', 'log group keeps events forever; set a retention period')
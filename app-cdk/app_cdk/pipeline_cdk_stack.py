@@ -3,20 +3,39 @@ from constructs import Construct
 from aws_cdk import (
     Stack,
     CfnOutput,
+    Duration,
+    PhysicalName,
+    RemovalPolicy,
     aws_codeconnections as codeconnections,
     aws_codepipeline as codepipeline,
     aws_codebuild as codebuild,
     aws_codepipeline_actions as codepipeline_actions,
     aws_iam as iam,
+    aws_s3 as s3,
     aws_ssm as ssm,
-    aws_codedeploy as codedeploy,
 )
 
+from app_cdk.pipeline_metrics import PipelineMetrics
+
+BUILD_IMAGES = {
+    'X86_64': codebuild.LinuxBuildImage.STANDARD_5_0,
+    'ARM64': codebuild.LinuxArmBuildImage.AMAZON_LINUX_2_STANDARD_3_0,
+}
+
+# Pushes that only touch other paths (app-cdk, docs) do not start the pipeline;
+# infrastructure is rolled out with cdk deploy.
+TRIGGER_FILE_PATHS = ('my-app/**', 'buildspec_*.yml', 'app-cdk/app_cdk/deploy_templates.py')
+
+# Where the Performance-Gate stage keeps each run in the PerfBaseline bucket
+PERF_RUNS_PREFIX = 'perf/runs'
+
 class PipelineCdkStack(Stack):
 
-    def __init__(self, scope: Construct, id: str, ecr_repository, test_app_fargate, prod_app_fargate, green_target_group, green_load_balancer_listener, **kwargs) -> None:
+    def __init__(self, scope: Construct, id: str, ecr_repository, cache_repository, test_app_fargate, prod_deployment_waves, build_architecture = 'X86_64', image_platforms = ('linux/amd64', 'linux/arm64'), soci_index = True, trigger_file_paths = TRIGGER_FILE_PATHS, load_test_seconds = 60, load_test_concurrency = 8, stage_slo_minutes = None, lead_time_slo_hours = 24, notification_email = None, cross_region_replication_buckets = None, **kwargs) -> None:
         super().__init__(scope, id, **kwargs)
 
+        build_image = BUILD_IMAGES[build_architecture]
+
         # Creates a CodeConnections resource called 'CICD_Workshop_Connection'
         SourceConnection = codeconnections.CfnConnection(self, "CICD_Workshop",
                 connection_name="CICD_Workshop_Connection",
@@ -27,14 +46,17 @@ class PipelineCdkStack(Stack):
             self, 'CICD_Pipeline',
             cross_account_keys = False,
             pipeline_type=codepipeline.PipelineType.V2,
-            execution_mode=codepipeline.ExecutionMode.QUEUED
+            execution_mode=codepipeline.ExecutionMode.QUEUED,
+            # One bucket per replica region, from stacks that depend on nothing;
+            # see ArtifactReplicationCdkStack
+            cross_region_replication_buckets = cross_region_replication_buckets
         )
 
         code_quality_build = codebuild.PipelineProject(
             self, 'CodeBuild',
             build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_test.yml'),
             environment = codebuild.BuildEnvironment(
-                build_image = codebuild.LinuxBuildImage.STANDARD_5_0,
+                build_image = build_image,
                 privileged = True,
                 compute_type = codebuild.ComputeType.LARGE,
             ),
@@ -43,19 +65,41 @@ class PipelineCdkStack(Stack):
         docker_build_project = codebuild.PipelineProject(
             self, 'Docker Build',
             build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_docker.yml'),
+            # Keeps the source checkout on the build host between back-to-back builds.
+            # Layers are cached in the build-cache registry: the docker-container
+            # buildx builder keeps its own layer store, which the local Docker layer
+            # cache never sees.
+            cache = codebuild.Cache.local(codebuild.LocalCacheMode.SOURCE),
             environment = codebuild.BuildEnvironment(
-                build_image = codebuild.LinuxBuildImage.STANDARD_5_0,
+                build_image = build_image,
                 privileged = True,
                 compute_type = codebuild.ComputeType.LARGE,
                 environment_variables = {
-                    'IMAGE_TAG': codebuild.BuildEnvironmentVariable(
+                    'IMAGE_PLATFORMS': codebuild.BuildEnvironmentVariable(
                         type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
-                        value = 'latest'
+                        value = ','.join(image_platforms)
+                    ),
+                    'SOCI_INDEX': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = 'enabled' if soci_index else 'disabled'
+                    ),
+                    'SOCI_VERSION': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = '0.8.0'
+                    ),
+                    # Layers below 10 MiB download faster whole than through the index
+                    'SOCI_MIN_LAYER_SIZE': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = str(10 * 1024 * 1024)
                     ),
                     'IMAGE_REPO_URI': codebuild.BuildEnvironmentVariable(
                         type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
                         value = ecr_repository.repository_uri
                     ),
+                    'CACHE_REPO_URI': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = cache_repository.repository_uri
+                    ),
                     'AWS_DEFAULT_REGION': codebuild.BuildEnvironmentVariable(
                         type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
                         value = os.environ['CDK_DEFAULT_REGION']
@@ -127,28 +171,215 @@ class PipelineCdkStack(Stack):
           actions = [source_action]
         )
 
-        build_action = codepipeline_actions.CodeBuildAction(
-            action_name = 'Unit-Test',
-            project = code_quality_build,
-            input = source_output,  # The build action must use the CodeStarConnectionsSourceAction output as input.
-            outputs = [unit_test_output]
+        if trigger_file_paths:
+            pipeline.add_trigger(
+                provider_type = codepipeline.ProviderType.CODE_STAR_SOURCE_CONNECTION,
+                git_configuration = codepipeline.GitConfiguration(
+                    source_action = source_action,
+                    push_filter = [
+                        codepipeline.GitPushFilter(
+                            branches_includes = ['main'],
+                            file_paths_includes = list(trigger_file_paths)
+                        )
+                    ]
+                )
+            )
+
+        # The repository also carries workshop archives and lab copies; every
+        # later action downloads only the slice of it that it needs.
+        package_project = codebuild.PipelineProject(
+            self, 'Package Artifacts',
+            build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_package.yml'),
+            environment = codebuild.BuildEnvironment(
+                build_image = build_image,
+                compute_type = codebuild.ComputeType.SMALL,
+            ),
         )
 
+        app_source_output = codepipeline.Artifact('app_source')
+
         pipeline.add_stage(
-            stage_name = 'Code-Quality-Testing',
-            actions = [build_action]
+            stage_name = 'Package',
+            actions = [
+                codepipeline_actions.CodeBuildAction(
+                    action_name = 'Package-Artifacts',
+                    project = package_project,
+                    input = source_output,  # The build action must use the CodeStarConnectionsSourceAction output as input.
+                    outputs = [app_source_output]
+                )
+            ]
         )
 
+        build_action = codepipeline_actions.CodeBuildAction(
+            action_name = 'Unit-Test',
+            project = code_quality_build,
+            input = app_source_output,
+            outputs = [unit_test_output],
+            run_order = 1
+        )
+
+        # Runs alongside the unit tests and only pushes a candidate tag; nothing
+        # deploys an image until Promote has seen both actions succeed.
         docker_build_action = codepipeline_actions.CodeBuildAction(
             action_name = 'Docker-Build',
             project = docker_build_project,
-            input = source_output,
-            outputs = [docker_build_output]
+            input = app_source_output,
+            run_order = 1
         )
 
+        promote_project = codebuild.PipelineProject(
+            self, 'Promote Image',
+            build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_promote.yml'),
+            environment = codebuild.BuildEnvironment(
+                build_image = build_image,
+                compute_type = codebuild.ComputeType.SMALL,
+                environment_variables = {
+                    'IMAGE_TAG': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = 'latest'
+                    ),
+                    'IMAGE_REPO_URI': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = ecr_repository.repository_uri
+                    ),
+                    'AWS_DEFAULT_REGION': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = os.environ['CDK_DEFAULT_REGION']
+                    )
+                }
+            ),
+        )
+
+        promote_project.add_to_role_policy(iam.PolicyStatement(
+            effect = iam.Effect.ALLOW,
+            actions = [
+                'ecr:BatchGetImage',
+                'ecr:PutImage'
+            ],
+            resources = [ecr_repository.repository_arn],
+        ))
+
+        promote_action = codepipeline_actions.CodeBuildAction(
+            action_name = 'Promote',
+            project = promote_project,
+            input = app_source_output,
+            outputs = [docker_build_output],
+            environment_variables = {
+                # Packaged artifacts no longer carry the commit as their source version
+                'COMMIT_ID': codebuild.BuildEnvironmentVariable(
+                    type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                    value = source_action.variables.commit_id
+                ),
+                'CANDIDATE_TAG': codebuild.BuildEnvironmentVariable(
+                    type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                    value = docker_build_action.variable('CANDIDATE_TAG')
+                )
+            },
+            run_order = 2
+        )
+
+        # taskdef.json and appspec.yaml are derived from each deployed blue/green
+        # stack, so task size, ports and hooks tuned in CDK reach CodeDeploy.
+        prod_stacks = [
+            Stack.of(deployment_group)
+            for deployment_groups in prod_deployment_waves
+            for deployment_group in deployment_groups
+        ]
+
+        deploy_templates_project = codebuild.PipelineProject(
+            self, 'Deploy Templates',
+            build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_deploy_templates.yml'),
+            environment = codebuild.BuildEnvironment(
+                build_image = build_image,
+                compute_type = codebuild.ComputeType.SMALL,
+                environment_variables = {
+                    'PROD_STACKS': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = self.to_json_string([
+                            {'stack': prod_stack.stack_name, 'region': prod_stack.region}
+                            for prod_stack in prod_stacks
+                        ])
+                    )
+                }
+            ),
+        )
+
+        deploy_templates_project.add_to_role_policy(iam.PolicyStatement(
+            effect = iam.Effect.ALLOW,
+            actions = [
+                'cloudformation:GetTemplate',
+                'cloudformation:DescribeStackResources',
+                'ecs:DescribeTaskDefinition'
+            ],
+            resources = ['*'],
+        ))
+
+        deploy_templates_output = codepipeline.Artifact('deploy_templates')
+
+        deploy_templates_action = codepipeline_actions.CodeBuildAction(
+            action_name = 'Generate-Deploy-Templates',
+            project = deploy_templates_project,
+            input = app_source_output,
+            outputs = [deploy_templates_output],
+            run_order = 1
+        )
+
+        # Promote's imageDetail.json names the repository in its own region. Stacks
+        # in other regions pull the same digest from the ECR replica next to them.
+        repository_region = Stack.of(ecr_repository).region
+        replica_regions = sorted({
+            prod_stack.region for prod_stack in prod_stacks
+            if prod_stack.region != repository_region
+        })
+        image_detail_outputs = {}
+        image_detail_actions = []
+
+        if replica_regions:
+            image_detail_project = codebuild.PipelineProject(
+                self, 'Regional Image Detail',
+                build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_image_detail.yml'),
+                environment = codebuild.BuildEnvironment(
+                    build_image = build_image,
+                    compute_type = codebuild.ComputeType.SMALL,
+                ),
+            )
+
+            image_detail_project.add_to_role_policy(iam.PolicyStatement(
+                effect = iam.Effect.ALLOW,
+                actions = ['ecr:DescribeImages'],
+                resources = [
+                    f'arn:{self.partition}:ecr:{region}:{Stack.of(ecr_repository).account}:repository/{ecr_repository.repository_name}'
+                    for region in replica_regions
+                ],
+            ))
+
+            for region in replica_regions:
+                image_detail_outputs[region] = codepipeline.Artifact(f'image_detail_{region}')
+                image_detail_actions.append(codepipeline_actions.CodeBuildAction(
+                    action_name = f'Image-Detail-{region}',
+                    project = image_detail_project,
+                    input = app_source_output,
+                    outputs = [image_detail_outputs[region]],
+                    environment_variables = {
+                        'IMAGE_REPO_URI': codebuild.BuildEnvironmentVariable(
+                            type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                            value = f'{Stack.of(ecr_repository).account}.dkr.ecr.{region}.{self.url_suffix}/{ecr_repository.repository_name}'
+                        ),
+                        'IMAGE_REGION': codebuild.BuildEnvironmentVariable(
+                            type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                            value = region
+                        ),
+                        'IMAGE_DIGEST': codebuild.BuildEnvironmentVariable(
+                            type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                            value = promote_action.variable('IMAGE_DIGEST')
+                        )
+                    },
+                    run_order = 3
+                ))
+
         pipeline.add_stage(
-            stage_name = 'Docker-Push-ECR',
-            actions = [docker_build_action]
+            stage_name = 'Build-And-Test',
+            actions = [build_action, docker_build_action, deploy_templates_action, promote_action] + image_detail_actions
         )
 
         pipeline.add_stage(
@@ -162,41 +393,146 @@ class PipelineCdkStack(Stack):
             ]
         )
 
-        ecs_code_deploy_app = codedeploy.EcsApplication(
-            self, 'my-app',
-            application_name = 'my-app'
+        # Last production release's load test report, the bar the next build must meet
+        perf_baseline_bucket = s3.Bucket(
+            self, 'PerfBaseline',
+            versioned = True,
+            block_public_access = s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl = True,
+            removal_policy = RemovalPolicy.DESTROY,
+            auto_delete_objects = True,
+            lifecycle_rules = [
+                s3.LifecycleRule(prefix = f'{PERF_RUNS_PREFIX}/', expiration = Duration.days(90))
+            ]
         )
 
-        prod_ecs_deployment_group = codedeploy.EcsDeploymentGroup(
-            self, 'my-app-dg',
-            service = prod_app_fargate.service,
-            blue_green_deployment_config = codedeploy.EcsBlueGreenDeploymentConfig(
-                blue_target_group = prod_app_fargate.target_group,
-                green_target_group = green_target_group,
-                listener = prod_app_fargate.listener,
-                test_listener = green_load_balancer_listener
+        perf_gate_project = codebuild.PipelineProject(
+            self, 'Performance Gate',
+            build_spec = codebuild.BuildSpec.from_source_filename('./buildspec_perf.yml'),
+            environment = codebuild.BuildEnvironment(
+                build_image = build_image,
+                compute_type = codebuild.ComputeType.MEDIUM,
+                environment_variables = {
+                    'TEST_ALB_DNS': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = test_app_fargate.load_balancer.load_balancer_dns_name
+                    ),
+                    'LOAD_DURATION': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = str(load_test_seconds)
+                    ),
+                    'LOAD_CONCURRENCY': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = str(load_test_concurrency)
+                    ),
+                    'BASELINE_BUCKET': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = perf_baseline_bucket.bucket_name
+                    ),
+                    'BASELINE_KEY': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = 'perf/perf-report.json'
+                    ),
+                    # Every run's report and verdict, passed or failed
+                    'RUNS_PREFIX': codebuild.BuildEnvironmentVariable(
+                        type = codebuild.BuildEnvironmentVariableType.PLAINTEXT,
+                        value = PERF_RUNS_PREFIX
+                    )
+                }
             ),
-            deployment_config = codedeploy.EcsDeploymentConfig.LINEAR_10_PERCENT_EVERY_1_MINUTES,
-            application = ecs_code_deploy_app
-        )       
+        )
+
+        perf_baseline_bucket.grant_read(perf_gate_project)
+        perf_baseline_bucket.grant_put(perf_gate_project, f'{PERF_RUNS_PREFIX}/*')
+
+        perf_gate_output = codepipeline.Artifact('perf_report')
 
         pipeline.add_stage(
-            stage_name = 'Deploy-Production',
+            stage_name = 'Performance-Gate',
             actions = [
-                codepipeline_actions.ManualApprovalAction(
+                codepipeline_actions.CodeBuildAction(
+                    action_name = 'Load-Test',
+                    project = perf_gate_project,
+                    input = app_source_output,
+                    outputs = [perf_gate_output]
+                )
+            ]
+        )
+
+        # Each wave is a list of blue/green deployment groups, one per region.
+        # Later waves only start once every region of the previous wave is done.
+        for wave_number, deployment_groups in enumerate(prod_deployment_waves, start = 1):
+            actions = []
+            run_order = 1
+            if wave_number == 1:
+                actions.append(codepipeline_actions.ManualApprovalAction(
                     action_name = 'Approve-Prod-Deploy',
                     run_order = 1
-                ),
-                codepipeline_actions.CodeDeployEcsDeployAction(
-                    action_name = 'ABlueGreen-deployECS',
-                    deployment_group = prod_ecs_deployment_group,
-                    app_spec_template_input = source_output,
-                    task_definition_template_input = source_output,
-                    run_order = 2
+                ))
+                run_order = 2
+
+            for deployment_group in deployment_groups:
+                action_name = 'ABlueGreen-deployECS'
+                if len(prod_deployment_waves) > 1 or len(deployment_groups) > 1:
+                    action_name = f'BlueGreen-{Stack.of(deployment_group).region}'
+
+                # A cross-region action reads from that region's replication bucket, whose
+                # policy would otherwise point back at a role token in this stack
+                action_role = None
+                if Stack.of(deployment_group).region != self.region:
+                    action_role = iam.Role(
+                        self, f'{action_name}-action-role',
+                        role_name = PhysicalName.GENERATE_IF_NEEDED,
+                        assumed_by = iam.AccountPrincipal(self.account)
+                    )
+
+                actions.append(codepipeline_actions.CodeDeployEcsDeployAction(
+                    action_name = action_name,
+                    deployment_group = deployment_group,
+                    role = action_role,
+                    app_spec_template_file = deploy_templates_output.at_path(f'{Stack.of(deployment_group).stack_name}/appspec.yaml'),
+                    task_definition_template_file = deploy_templates_output.at_path(f'{Stack.of(deployment_group).stack_name}/taskdef.json'),
+                    # The generated taskdef.json names the image <IMAGE1_NAME>; imageDetail.json pins the
+                    # digest in the repository of the stack's own region
+                    container_image_inputs = [
+                        codepipeline_actions.CodeDeployEcsContainerImageInput(
+                            input = image_detail_outputs.get(Stack.of(deployment_group).region, docker_build_output),
+                            task_definition_placeholder = 'IMAGE1_NAME'
+                        )
+                    ],
+                    run_order = run_order
+                ))
+
+            production_stage = 'Deploy-Production' if wave_number == 1 else f'Deploy-Production-Wave-{wave_number}'
+            pipeline.add_stage(
+                stage_name = production_stage,
+                actions = actions
+            )
+
+        # Only a build that reached every production region becomes the new baseline
+        pipeline.add_stage(
+            stage_name = 'Record-Perf-Baseline',
+            actions = [
+                codepipeline_actions.S3DeployAction(
+                    action_name = 'Store-Baseline',
+                    bucket = perf_baseline_bucket,
+                    input = perf_gate_output,
+                    object_key = 'perf',
+                    extract = True
                 )
             ]
         )
 
+        # Lead time ends when the last production wave has deployed
+        PipelineMetrics(
+            self, 'pipeline-metrics',
+            pipeline = pipeline,
+            production_stage = production_stage,
+            stage_slo_minutes = stage_slo_minutes,
+            lead_time_slo_hours = lead_time_slo_hours,
+            notification_email = notification_email
+        )
+
         CfnOutput(
             self, 'SourceConnectionArn',
             value = SourceConnection.attr_connection_arn
@@ -0,0 +1,156 @@
+"""Publish pipeline stage durations and push-to-prod lead time as metrics.
+
+EventBridge delivers CodePipeline stage and action state changes. State
+change events carry only the time of the change, so once a stage or action
+finishes the handler looks up the execution's action history
+(``ListActionExecutions``) to measure it:
+
+* ``ActionDuration``: start to last update of the action.
+* ``StageDuration``: first action start to last action update in the stage.
+  Manual approvals are left out, so the stage SLO measures the automation
+  and not how long the approver took.
+* ``LeadTime``: from the source revision's commit to the end of the last
+  production stage, approvals included.
+"""
+import os
+from datetime import datetime, timezone
+
+STAGE_EVENT = 'CodePipeline Stage Execution State Change'
+ACTION_EVENT = 'CodePipeline Action Execution State Change'
+FINISHED_STATES = ('SUCCEEDED', 'FAILED')
+
+
+def parse_time(value):
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, (int, float)):
+        moment = datetime.fromtimestamp(value, timezone.utc)
+    else:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo = timezone.utc)
+    return moment
+
+
+def _seconds(started, finished):
+    return round((parse_time(finished) - parse_time(started)).total_seconds(), 3)
+
+
+def _is_approval(action_execution):
+    return action_execution.get('input', {}).get('actionTypeId', {}).get('category') == 'Approval'
+
+
+def action_duration(action_executions, stage, action):
+    runs = [
+        execution for execution in action_executions
+        if execution['stageName'] == stage and execution['actionName'] == action
+    ]
+    if not runs:
+        return None
+    # A retried action has one execution per attempt; the latest one finished the stage
+    latest = max(runs, key = lambda execution: parse_time(execution['startTime']))
+    return _seconds(latest['startTime'], latest['lastUpdateTime'])
+
+
+def stage_duration(action_executions, stage):
+    runs = [
+        execution for execution in action_executions
+        if execution['stageName'] == stage and not _is_approval(execution)
+    ]
+    if not runs:
+        return None
+    started = min(parse_time(execution['startTime']) for execution in runs)
+    finished = max(parse_time(execution['lastUpdateTime']) for execution in runs)
+    return _seconds(started, finished)
+
+
+def lead_time(pipeline_execution, action_executions, finished):
+    commits = [
+        revision['created']
+        for revision in pipeline_execution.get('artifactRevisions', [])
+        if revision.get('created')
+    ]
+    # Without a commit time, fall back to the start of the execution
+    starts = commits or [execution['startTime'] for execution in action_executions]
+    if not starts:
+        return None
+    return _seconds(min(parse_time(start) for start in starts), finished)
+
+
+def measurements(event, action_executions, pipeline_execution = None, production_stage = None):
+    detail = event['detail']
+    if detail.get('state') not in FINISHED_STATES:
+        return []
+
+    pipeline, stage = detail['pipeline'], detail['stage']
+    results = []
+    if event['detail-type'] == ACTION_EVENT:
+        seconds = action_duration(action_executions, stage, detail['action'])
+        if seconds is not None:
+            results.append(('ActionDuration', {'Pipeline': pipeline, 'Stage': stage, 'Action': detail['action']}, seconds))
+        return results
+
+    seconds = stage_duration(action_executions, stage)
+    if seconds is not None:
+        results.append(('StageDuration', {'Pipeline': pipeline, 'Stage': stage}, seconds))
+
+    if stage == production_stage and detail['state'] == 'SUCCEEDED' and pipeline_execution is not None:
+        seconds = lead_time(pipeline_execution, action_executions, event['time'])
+        if seconds is not None:
+            results.append(('LeadTime', {'Pipeline': pipeline}, seconds))
+    return results
+
+
+def metric_data(results, timestamp):
+    return [
+        {
+            'MetricName': name,
+            'Dimensions': [{'Name': key, 'Value': value} for key, value in dimensions.items()],
+            'Timestamp': parse_time(timestamp),
+            'Value': seconds,
+            'Unit': 'Seconds',
+        }
+        for name, dimensions, seconds in results
+    ]
+
+
+def fetch_executions(pipeline, execution_id, include_pipeline_execution):
+    import boto3
+
+    codepipeline = boto3.client('codepipeline')
+    action_executions = []
+    paginator = codepipeline.get_paginator('list_action_executions')
+    for page in paginator.paginate(pipelineName = pipeline, filter = {'pipelineExecutionId': execution_id}):
+        action_executions.extend(page['actionExecutionDetails'])
+
+    pipeline_execution = None
+    if include_pipeline_execution:
+        pipeline_execution = codepipeline.get_pipeline_execution(
+            pipelineName = pipeline,
+            pipelineExecutionId = execution_id
+        )['pipelineExecution']
+    return action_executions, pipeline_execution
+
+
+def publish(namespace, data):
+    import boto3
+
+    if data:
+        boto3.client('cloudwatch').put_metric_data(Namespace = namespace, MetricData = data)
+
+
+def handler(event, context):
+    detail = event['detail']
+    if detail.get('state') not in FINISHED_STATES:
+        return []
+
+    production_stage = os.environ.get('PRODUCTION_STAGE')
+    action_executions, pipeline_execution = fetch_executions(
+        detail['pipeline'],
+        detail['execution-id'],
+        include_pipeline_execution = event['detail-type'] == STAGE_EVENT and detail['stage'] == production_stage
+    )
+    results = measurements(event, action_executions, pipeline_execution, production_stage)
+    print({'execution-id': detail['execution-id'], 'measurements': results})
+    publish(os.environ['METRICS_NAMESPACE'], metric_data(results, event['time']))
+    return results
\ No newline at end of file
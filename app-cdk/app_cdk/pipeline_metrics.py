@@ -0,0 +1,145 @@
+from pathlib import Path
+
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cloudwatch_actions,
+    aws_codepipeline as codepipeline,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+    aws_sns as sns,
+    aws_sns_subscriptions as subscriptions,
+)
+
+PIPELINE_EVENTS_DIRECTORY = Path(__file__).resolve().parent / 'pipeline_events'
+METRICS_NAMESPACE = 'CICD/Pipeline'
+
+# Upper bounds for the automated part of each stage, in minutes
+STAGE_SLO_MINUTES = {
+    'Package': 5,
+    'Build-And-Test': 15,
+    'Deploy-Test': 15,
+    'Performance-Gate': 10,
+}
+
+
+class PipelineMetrics(Construct):
+    """Stage durations and lead time of a pipeline, with SLO alarms.
+
+    State changes of stages and actions invoke a Lambda that publishes
+    ``StageDuration``, ``ActionDuration`` and ``LeadTime`` to the
+    ``CICD/Pipeline`` namespace. Stages that exceed their SLO, and releases
+    that take longer than the lead time SLO to reach production, notify the
+    SLO topic.
+    """
+
+    @property
+    def topic_data(self):
+        return self.topic
+
+    @property
+    def alarms_data(self):
+        return self.alarms
+
+    def __init__(self, scope: Construct, id: str, pipeline: codepipeline.IPipeline, production_stage: str, stage_slo_minutes = None, lead_time_slo_hours: float = 24, notification_email: str = None, **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        stage_slo_minutes = STAGE_SLO_MINUTES if stage_slo_minutes is None else stage_slo_minutes
+
+        self.function = lambda_.Function(
+            self, 'function',
+            runtime = lambda_.Runtime.PYTHON_3_12,
+            handler = 'stage_metrics.handler',
+            code = lambda_.Code.from_asset(str(PIPELINE_EVENTS_DIRECTORY)),
+            timeout = Duration.seconds(30),
+            log_group = logs.LogGroup(
+                self, 'log-group',
+                retention = logs.RetentionDays.ONE_MONTH
+            ),
+            environment = {
+                'METRICS_NAMESPACE': METRICS_NAMESPACE,
+                'PRODUCTION_STAGE': production_stage
+            }
+        )
+
+        self.function.add_to_role_policy(iam.PolicyStatement(
+            effect = iam.Effect.ALLOW,
+            actions = ['codepipeline:ListActionExecutions', 'codepipeline:GetPipelineExecution'],
+            resources = [pipeline.pipeline_arn],
+        ))
+
+        self.function.add_to_role_policy(iam.PolicyStatement(
+            effect = iam.Effect.ALLOW,
+            actions = ['cloudwatch:PutMetricData'],
+            resources = ['*'],
+            conditions = {'StringEquals': {'cloudwatch:namespace': METRICS_NAMESPACE}},
+        ))
+
+        for rule_id, detail_type in (
+            ('stage-state-change', 'CodePipeline Stage Execution State Change'),
+            ('action-state-change', 'CodePipeline Action Execution State Change'),
+        ):
+            events.Rule(
+                self, rule_id,
+                description = f'{detail_type} of {pipeline.pipeline_name}',
+                event_pattern = events.EventPattern(
+                    source = ['aws.codepipeline'],
+                    detail_type = [detail_type],
+                    resources = [pipeline.pipeline_arn],
+                    detail = {'state': ['SUCCEEDED', 'FAILED']}
+                ),
+                targets = [targets.LambdaFunction(self.function)]
+            )
+
+        self.topic = sns.Topic(
+            self, 'slo-topic',
+            display_name = 'Pipeline SLO'
+        )
+        if notification_email:
+            self.topic.add_subscription(subscriptions.EmailSubscription(notification_email))
+
+        self.alarms = []
+        for stage, minutes in stage_slo_minutes.items():
+            self.alarms.append(self._slo_alarm(
+                f'{stage}-duration-alarm',
+                f'{stage} took longer than {minutes} minutes',
+                cloudwatch.Metric(
+                    namespace = METRICS_NAMESPACE,
+                    metric_name = 'StageDuration',
+                    dimensions_map = {'Pipeline': pipeline.pipeline_name, 'Stage': stage},
+                    statistic = 'Maximum',
+                    period = Duration.minutes(5)
+                ),
+                threshold = minutes * 60
+            ))
+
+        self.alarms.append(self._slo_alarm(
+            'lead-time-alarm',
+            f'A commit took longer than {lead_time_slo_hours} hours to reach production',
+            cloudwatch.Metric(
+                namespace = METRICS_NAMESPACE,
+                metric_name = 'LeadTime',
+                dimensions_map = {'Pipeline': pipeline.pipeline_name},
+                statistic = 'Maximum',
+                period = Duration.minutes(5)
+            ),
+            threshold = lead_time_slo_hours * 3600
+        ))
+
+    def _slo_alarm(self, id, description, metric, threshold):
+        # Datapoints only exist when a stage finishes, so one breaching run is enough
+        alarm = cloudwatch.Alarm(
+            self, id,
+            alarm_description = description,
+            metric = metric,
+            threshold = threshold,
+            evaluation_periods = 1,
+            comparison_operator = cloudwatch.ComparisonOperator.GREATER_THAN_THRESHOLD,
+            treat_missing_data = cloudwatch.TreatMissingData.NOT_BREACHING
+        )
+        alarm.add_alarm_action(cloudwatch_actions.SnsAction(self.topic))
+        return alarm
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Propose scheduled minimum capacity from historical ALB request counts.
+
+Reads a CloudWatch export of the load balancer ``RequestCount`` metric and
+prints ScheduledCapacity entries that raise the service floor ``lead_minutes``
+before each recurring daily peak, so tasks are already healthy when traffic
+arrives.
+
+Accepted inputs:
+  * CSV with a timestamp column followed by a count column (header optional)
+  * ``aws cloudwatch get-metric-data`` JSON output
+  * ``aws cloudwatch get-metric-statistics`` JSON output (Sum statistic)
+  * a JSON list of ``{"timestamp": ..., "value": ...}`` objects
+
+Usage:
+  python -m app_cdk.schedule_planner request-count.csv --requests-per-task 500
+"""
+import argparse
+import csv
+import json
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz = timezone.utc)
+    timestamp = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo = timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def load_request_counts(path):
+    if path.endswith('.json'):
+        with open(path) as export:
+            return _samples_from_json(json.load(export))
+
+    samples = []
+    with open(path, newline = '') as export:
+        for row in csv.reader(export):
+            if len(row) < 2:
+                continue
+            try:
+                samples.append((parse_timestamp(row[0]), float(row[1])))
+            except ValueError:
+                # Header or malformed line
+                continue
+    return sorted(samples)
+
+
+def _samples_from_json(document):
+    if isinstance(document, list):
+        samples = [(parse_timestamp(item['timestamp']), float(item['value'])) for item in document]
+    elif 'MetricDataResults' in document:
+        samples = []
+        for result in document['MetricDataResults']:
+            samples.extend(
+                (parse_timestamp(timestamp), float(value))
+                for timestamp, value in zip(result['Timestamps'], result['Values'])
+            )
+    elif 'Datapoints' in document:
+        samples = [(parse_timestamp(point['Timestamp']), float(point['Sum'])) for point in document['Datapoints']]
+    else:
+        raise ValueError('unrecognised request count export')
+    return sorted(samples)
+
+
+def sample_period_minutes(samples):
+    deltas = Counter(
+        int((later[0] - earlier[0]).total_seconds() // 60)
+        for earlier, later in zip(samples, samples[1:])
+    )
+    deltas.pop(0, None)
+    if not deltas:
+        return 1
+    return deltas.most_common(1)[0][0]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def required_tasks_by_slot(samples, requests_per_task, slot_minutes = 60, fraction = 0.9):
+    """Return the tasks needed for each slot of the day, keyed by minute-of-day."""
+    if not samples:
+        raise ValueError('no request count samples')
+    period = sample_period_minutes(samples)
+
+    rates = defaultdict(list)
+    for timestamp, count in samples:
+        minute_of_day = timestamp.hour * 60 + timestamp.minute
+        slot = minute_of_day - minute_of_day % slot_minutes
+        rates[slot].append(count / period)
+
+    return {
+        slot: math.ceil(percentile(values, fraction) / requests_per_task)
+        for slot, values in sorted(rates.items())
+    }
+
+
+def propose_schedule(
+    samples,
+    requests_per_task,
+    baseline_capacity = 1,
+    max_capacity = None,
+    lead_minutes = 15,
+    slot_minutes = 60,
+    fraction = 0.9,
+):
+    required = required_tasks_by_slot(samples, requests_per_task, slot_minutes, fraction)
+
+    floors = []
+    for slot in range(0, 24 * 60, slot_minutes):
+        floor = max(baseline_capacity, required.get(slot, 0))
+        if max_capacity is not None:
+            floor = min(floor, max_capacity)
+        floors.append((slot, floor))
+
+    schedule = []
+    for index, (slot, floor) in enumerate(floors):
+        previous_floor = floors[index - 1][1]
+        if floor == previous_floor:
+            continue
+        # Scale-out is moved ahead of the peak; scale-in waits until it is over.
+        start = (slot - lead_minutes) % (24 * 60) if floor > previous_floor else slot
+        hour, minute = divmod(start, 60)
+        schedule.append({
+            'name': f'floor-{floor}-at-{hour:02d}{minute:02d}',
+            'cron': f'{minute} {hour} * * ? *',
+            'min_capacity': floor,
+        })
+    return schedule
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Propose scheduled scaling from historical ALB request counts.')
+    parser.add_argument('export', help = 'CSV or JSON export of the ALB RequestCount metric')
+    parser.add_argument('--requests-per-task', type = float, default = 500,
+                        help = 'requests per minute a single task sustains (matches requests_per_target)')
+    parser.add_argument('--baseline', type = int, default = 1, help = 'minimum capacity outside peaks')
+    parser.add_argument('--max-capacity', type = int, default = None)
+    parser.add_argument('--lead-minutes', type = int, default = 15,
+                        help = 'how long before a peak the floor is raised')
+    parser.add_argument('--slot-minutes', type = int, default = 60)
+    parser.add_argument('--percentile', type = float, default = 0.9)
+    args = parser.parse_args(argv)
+
+    schedule = propose_schedule(
+        load_request_counts(args.export),
+        requests_per_task = args.requests_per_task,
+        baseline_capacity = args.baseline,
+        max_capacity = args.max_capacity,
+        lead_minutes = args.lead_minutes,
+        slot_minutes = args.slot_minutes,
+        fraction = args.percentile,
+    )
+    print(json.dumps(schedule, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    aws_cloudwatch as cloudwatch,
+    aws_ecs_patterns as ecs_patterns,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+
+# CloudWatch graphs standard-resolution metrics at one minute or coarser
+MIN_DASHBOARD_PERIOD_SECONDS = 60
+
+
+@dataclass(frozen = True)
+class DashboardProps:
+    enabled: bool = True
+    period_seconds: int = 60
+    # Drawn as a horizontal line on the response time graph
+    latency_target_seconds: Optional[float] = None
+
+    def __post_init__(self):
+        if self.period_seconds < MIN_DASHBOARD_PERIOD_SECONDS or self.period_seconds % 60:
+            raise ValueError('dashboard period_seconds must be a multiple of 60')
+        if self.latency_target_seconds is not None and self.latency_target_seconds <= 0:
+            raise ValueError('dashboard latency_target_seconds must be positive')
+
+
+class ServiceDashboard(Construct):
+    """What users of one environment experience, on a single dashboard.
+
+    Response time percentiles, traffic and 5xx responses are taken from the
+    load balancer, so they cover whichever target group serves production.
+    Healthy hosts are graphed per target group to follow a blue/green shift.
+    Running and desired task counts come from Container Insights when the
+    cluster has it; otherwise the running count is the number of tasks that
+    report CPU to AWS/ECS.
+    """
+
+    @property
+    def dashboard_data(self):
+        return self.dashboard
+
+    def __init__(self, scope: Construct, id: str, environment_name: str, service: ecs_patterns.ApplicationLoadBalancedFargateService, target_groups, props: DashboardProps, container_insights: bool = False, **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        period = Duration.seconds(props.period_seconds)
+        load_balancer_metrics = service.load_balancer.metrics
+
+        response_time = cloudwatch.GraphWidget(
+            title = 'Target response time',
+            width = 12,
+            left = [
+                load_balancer_metrics.target_response_time(statistic = statistic, label = statistic, period = period)
+                for statistic in ('p50', 'p90', 'p99')
+            ],
+            left_annotations = [
+                cloudwatch.HorizontalAnnotation(value = props.latency_target_seconds, label = 'target')
+            ] if props.latency_target_seconds is not None else None
+        )
+
+        traffic = cloudwatch.GraphWidget(
+            title = 'Requests and target 5xx',
+            width = 12,
+            left = [load_balancer_metrics.request_count(label = 'requests', period = period)],
+            right = [
+                load_balancer_metrics.http_code_target(
+                    elbv2.HttpCodeTarget.TARGET_5XX_COUNT,
+                    label = '5xx',
+                    period = period
+                )
+            ]
+        )
+
+        healthy_hosts = cloudwatch.GraphWidget(
+            title = 'Healthy hosts',
+            width = 8,
+            left = [
+                target_group.metrics.healthy_host_count(
+                    label = ('blue', 'green')[index] if len(target_groups) > 1 else 'healthy',
+                    statistic = 'Minimum',
+                    period = period
+                )
+                for index, target_group in enumerate(target_groups)
+            ]
+        )
+
+        utilization = cloudwatch.GraphWidget(
+            title = 'Service CPU and memory',
+            width = 8,
+            left = [
+                service.service.metric_cpu_utilization(label = 'cpu %', period = period),
+                service.service.metric_memory_utilization(label = 'memory %', period = period)
+            ],
+            left_y_axis = cloudwatch.YAxisProps(min = 0, max = 100)
+        )
+
+        if container_insights:
+            task_counts = [
+                cloudwatch.Metric(
+                    namespace = 'ECS/ContainerInsights',
+                    metric_name = metric_name,
+                    dimensions_map = {
+                        'ClusterName': service.cluster.cluster_name,
+                        'ServiceName': service.service.service_name
+                    },
+                    statistic = 'Average',
+                    label = label,
+                    period = period
+                )
+                for metric_name, label in (('RunningTaskCount', 'running'), ('DesiredTaskCount', 'desired'))
+            ]
+        else:
+            # Each running task reports CPU once a minute
+            task_counts = [
+                cloudwatch.MathExpression(
+                    expression = f'cpu_samples / {props.period_seconds // 60}',
+                    using_metrics = {
+                        'cpu_samples': service.service.metric_cpu_utilization(statistic = 'SampleCount', period = period)
+                    },
+                    label = 'running',
+                    period = period
+                )
+            ]
+
+        tasks = cloudwatch.GraphWidget(
+            title = 'Running tasks',
+            width = 8,
+            left = task_counts
+        )
+
+        self.dashboard = cloudwatch.Dashboard(
+            self, 'dashboard',
+            dashboard_name = f'{environment_name}-performance',
+            default_interval = Duration.hours(3),
+            widgets = [
+                [response_time, traffic],
+                [healthy_hosts, utilization, tasks]
+            ]
+        )
\ No newline at end of file
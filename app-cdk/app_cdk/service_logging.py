@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from constructs import Construct
+from aws_cdk import (
+    Size,
+    Stack,
+    aws_ecr_assets as ecr_assets,
+    aws_ecs as ecs,
+    aws_logs as logs,
+)
+
+LOG_DRIVERS = ('awslogs', 'firelens')
+LOG_ROUTER_DIRECTORY = Path(__file__).resolve().parent.parent / 'log-router'
+# Baked into the log router image, see log-router/Dockerfile
+LOG_ROUTER_FILTER_CONFIG = '/fluent-bit/etc/filters.conf'
+
+# Fargate accepts a FireLens buffer between 0 and 512 MiB
+MAX_FIRELENS_BUFFER_LIMIT_BYTES = 536870912
+
+
+@dataclass(frozen = True)
+class LoggingProps:
+    driver: str = 'awslogs'
+    # Name of an aws_logs.RetentionDays member
+    retention: str = 'ONE_MONTH'
+    # awslogs: never block the application on a slow CloudWatch Logs API
+    non_blocking: bool = True
+    max_buffer_size_mib: int = 25
+    # firelens: events the router may hold in memory before the app is throttled
+    firelens_buffer_limit_bytes: int = 2097152
+    drop_health_checks: bool = True
+    router_cpu: int = 32
+    router_memory_reservation_mib: int = 50
+
+    def __post_init__(self):
+        if self.driver not in LOG_DRIVERS:
+            raise ValueError(f'logging driver must be one of {", ".join(LOG_DRIVERS)}')
+        if self.retention == 'INFINITE' or not hasattr(logs.RetentionDays, self.retention):
+            raise ValueError('logging retention must name a finite aws_logs.RetentionDays period')
+        if not 0 < self.firelens_buffer_limit_bytes <= MAX_FIRELENS_BUFFER_LIMIT_BYTES:
+            raise ValueError(f'firelens_buffer_limit_bytes must be between 1 and {MAX_FIRELENS_BUFFER_LIMIT_BYTES}')
+
+
+def create_log_driver(scope: Construct, props: LoggingProps):
+    log_group = logs.LogGroup(
+        scope, 'log-group',
+        retention = getattr(logs.RetentionDays, props.retention)
+    )
+
+    if props.driver == 'firelens':
+        # Fluent Bit's cloudwatch_logs output batches events into PutLogEvents calls
+        log_driver = ecs.LogDrivers.firelens(options = {
+            'Name': 'cloudwatch_logs',
+            'region': Stack.of(scope).region,
+            'log_group_name': log_group.log_group_name,
+            'log_stream_prefix': 'my-app/',
+            'auto_create_group': 'false',
+            'log-driver-buffer-limit': str(props.firelens_buffer_limit_bytes)
+        })
+    else:
+        log_driver = ecs.LogDrivers.aws_logs(
+            stream_prefix = 'my-app',
+            log_group = log_group,
+            mode = ecs.AwsLogDriverMode.NON_BLOCKING if props.non_blocking else ecs.AwsLogDriverMode.BLOCKING,
+            max_buffer_size = Size.mebibytes(props.max_buffer_size_mib) if props.non_blocking else None
+        )
+
+    return log_driver, log_group
+
+
+def add_log_router(task_definition: ecs.TaskDefinition, props: LoggingProps, log_group: logs.ILogGroup, cpu_architecture: str = 'X86_64'):
+    platform = ecr_assets.Platform.LINUX_ARM64 if cpu_architecture == 'ARM64' else ecr_assets.Platform.LINUX_AMD64
+
+    config_options = None
+    if props.drop_health_checks:
+        config_options = ecs.FirelensOptions(
+            config_file_type = ecs.FirelensConfigFileType.FILE,
+            config_file_value = LOG_ROUTER_FILTER_CONFIG
+        )
+
+    # A small fixed CPU share keeps log shipping from competing with gunicorn
+    router = task_definition.add_firelens_log_router(
+        'log-router',
+        image = ecs.ContainerImage.from_asset(str(LOG_ROUTER_DIRECTORY), platform = platform),
+        firelens_config = ecs.FirelensConfig(
+            type = ecs.FirelensLogRouterType.FLUENTBIT,
+            options = config_options
+        ),
+        cpu = props.router_cpu,
+        memory_reservation_mib = props.router_memory_reservation_mib,
+        essential = True,
+        logging = ecs.LogDrivers.aws_logs(
+            stream_prefix = 'log-router',
+            log_group = log_group,
+            mode = ecs.AwsLogDriverMode.NON_BLOCKING
+        )
+    )
+
+    log_group.grant_write(task_definition.task_role)
+    return router
@@ -0,0 +1,285 @@
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+from constructs import Construct
+
+from app_cdk.service_dashboard import DashboardProps
+from app_cdk.service_logging import LoggingProps
+from app_cdk.service_scaling import ScalingProps, ScheduledCapacity
+
+PROFILES_DIRECTORY = Path(__file__).resolve().parent.parent / 'profiles'
+PROFILES_CONTEXT_KEY = 'service-profiles'
+
+DEPLOYMENT_CONTROLLERS = ('ECS', 'CODE_DEPLOY')
+CAPACITY_PROVIDERS = ('FARGATE', 'FARGATE_SPOT')
+CPU_ARCHITECTURES = ('X86_64', 'ARM64')
+ROUTING_ALGORITHMS = ('round_robin', 'least_outstanding_requests')
+PRICE_CLASSES = ('PRICE_CLASS_100', 'PRICE_CLASS_200', 'PRICE_CLASS_ALL')
+CONTAINER_INSIGHTS = ('DISABLED', 'ENABLED', 'ENHANCED')
+# aws_codedeploy.EcsDeploymentConfig members
+ECS_DEPLOYMENT_CONFIGS = (
+    'ALL_AT_ONCE',
+    'CANARY_10_PERCENT_5_MINUTES',
+    'CANARY_10_PERCENT_15_MINUTES',
+    'LINEAR_10_PERCENT_EVERY_1_MINUTES',
+    'LINEAR_10_PERCENT_EVERY_3_MINUTES',
+)
+
+# ECS caps the container health check grace period at five minutes
+MAX_START_PERIOD_SECONDS = 300
+
+# Fargate sends SIGKILL at most 120 seconds after SIGTERM, which is also the
+# length of the Fargate Spot interruption warning.
+MAX_STOP_TIMEOUT_SECONDS = 120
+
+
+@dataclass(frozen = True)
+class HealthCheckProps:
+    path: str = '/'
+    interval_seconds: int = 11
+    timeout_seconds: int = 10
+    healthy_threshold_count: int = 2
+    unhealthy_threshold_count: int = 2
+
+    def __post_init__(self):
+        if self.timeout_seconds >= self.interval_seconds:
+            raise ValueError('health check timeout must be shorter than its interval')
+
+
+@dataclass(frozen = True)
+class ContainerHealthCheckProps:
+    path: str = '/healthcheck'
+    interval_seconds: int = 5
+    timeout_seconds: int = 2
+    retries: int = 2
+    start_period_seconds: Optional[int] = None
+    # Observed container start-to-ready time; when set, the grace period is derived from it
+    measured_startup_seconds: Optional[float] = None
+
+    def __post_init__(self):
+        if not 5 <= self.interval_seconds <= 300:
+            raise ValueError('container health check interval_seconds must be between 5 and 300')
+        if not 2 <= self.timeout_seconds <= 60:
+            raise ValueError('container health check timeout_seconds must be between 2 and 60')
+        if self.start_period_seconds is not None and not 0 <= self.start_period_seconds <= MAX_START_PERIOD_SECONDS:
+            raise ValueError(f'start_period_seconds must be between 0 and {MAX_START_PERIOD_SECONDS}')
+
+    @property
+    def effective_start_period_seconds(self) -> int:
+        if self.start_period_seconds is not None:
+            return self.start_period_seconds
+        if self.measured_startup_seconds is not None:
+            # Half again the measured startup absorbs cold-start variance without
+            # delaying detection of a container that never comes up.
+            return min(MAX_START_PERIOD_SECONDS, math.ceil(self.measured_startup_seconds * 1.5))
+        return 0
+
+
+@dataclass(frozen = True)
+class RollingDeploymentProps:
+    min_healthy_percent: int = 100
+    max_healthy_percent: int = 200
+    circuit_breaker_rollback: bool = True
+
+    def __post_init__(self):
+        if self.max_healthy_percent <= self.min_healthy_percent:
+            raise ValueError('max_healthy_percent must exceed min_healthy_percent')
+
+
+@dataclass(frozen = True)
+class BlueGreenDeploymentProps:
+    deployment_config: str = 'CANARY_10_PERCENT_5_MINUTES'
+    # Alarms on the replacement target group stop and roll back the shift
+    p99_latency_threshold_seconds: float = 1.0
+    error_rate_threshold_percent: float = 1.0
+    alarm_evaluation_periods: int = 2
+
+    def __post_init__(self):
+        if self.deployment_config not in ECS_DEPLOYMENT_CONFIGS:
+            raise ValueError(f'deployment_config must be one of {", ".join(ECS_DEPLOYMENT_CONFIGS)}')
+        if self.p99_latency_threshold_seconds <= 0 or self.error_rate_threshold_percent <= 0:
+            raise ValueError('blue/green alarm thresholds must be positive')
+        if self.alarm_evaluation_periods < 1:
+            raise ValueError('alarm_evaluation_periods must be at least 1')
+
+
+@dataclass(frozen = True)
+class LoadBalancerProps:
+    routing_algorithm: str = 'round_robin'
+    slow_start_seconds: int = 0
+    http2_enabled: bool = True
+    idle_timeout_seconds: int = 60
+    client_keep_alive_seconds: int = 3600
+    target_keep_alive_seconds: int = 65
+
+    def __post_init__(self):
+        if self.routing_algorithm not in ROUTING_ALGORITHMS:
+            raise ValueError(f'routing_algorithm must be one of {", ".join(ROUTING_ALGORITHMS)}')
+        if self.slow_start_seconds and not 30 <= self.slow_start_seconds <= 900:
+            raise ValueError('slow_start_seconds must be 0 or between 30 and 900')
+        if self.slow_start_seconds and self.routing_algorithm == 'least_outstanding_requests':
+            raise ValueError('slow start cannot be combined with least_outstanding_requests routing')
+        if not 1 <= self.idle_timeout_seconds <= 4000:
+            raise ValueError('idle_timeout_seconds must be between 1 and 4000')
+        if not 60 <= self.client_keep_alive_seconds <= 604800:
+            raise ValueError('client_keep_alive_seconds must be between 60 and 604800')
+        # A target that closes an idle connection first races the ALB reusing
+        # it, which surfaces as sporadic 502 responses.
+        if self.target_keep_alive_seconds <= self.idle_timeout_seconds:
+            raise ValueError('target_keep_alive_seconds must exceed idle_timeout_seconds')
+
+
+@dataclass(frozen = True)
+class EdgeCacheProps:
+    enabled: bool = False
+    origin_shield: bool = True
+    # Defaults to the stack region, which is where the load balancer origin lives
+    origin_shield_region: Optional[str] = None
+    default_ttl_seconds: int = 0
+    max_ttl_seconds: int = 86400
+    price_class: str = 'PRICE_CLASS_100'
+
+    def __post_init__(self):
+        if self.price_class not in PRICE_CLASSES:
+            raise ValueError(f'price_class must be one of {", ".join(PRICE_CLASSES)}')
+        if self.default_ttl_seconds > self.max_ttl_seconds:
+            raise ValueError('default_ttl_seconds must not exceed max_ttl_seconds')
+
+
+@dataclass(frozen = True)
+class DnsProps:
+    hosted_zone_id: str
+    zone_name: str
+    record_name: str
+
+
+@dataclass(frozen = True)
+class CapacityProviderProps:
+    capacity_provider: str
+    weight: int = 1
+    base: int = 0
+
+    def __post_init__(self):
+        if self.capacity_provider not in CAPACITY_PROVIDERS:
+            raise ValueError(f'capacity_provider must be one of {", ".join(CAPACITY_PROVIDERS)}')
+
+
+@dataclass(frozen = True)
+class ServiceProfile:
+    cpu: int = 512
+    memory_limit_mib: int = 1024
+    desired_count: Optional[int] = None
+    container_port: int = 8081
+    deployment_controller: str = 'ECS'
+    deregistration_delay_seconds: int = 5
+    health_check: HealthCheckProps = field(default_factory = HealthCheckProps)
+    scaling: Optional[ScalingProps] = None
+    capacity_providers: Tuple[CapacityProviderProps, ...] = ()
+    stop_timeout_seconds: int = 30
+    cpu_architecture: str = 'X86_64'
+    load_balancer: LoadBalancerProps = field(default_factory = LoadBalancerProps)
+    edge_cache: EdgeCacheProps = field(default_factory = EdgeCacheProps)
+    vpc_endpoints: bool = False
+    # Run in the shared network-stack VPC and cluster instead of owning one
+    shared_network: bool = False
+    # Latency-based record in front of the regional load balancers
+    dns: Optional[DnsProps] = None
+    container_health_check: ContainerHealthCheckProps = field(default_factory = ContainerHealthCheckProps)
+    # Rolling (ECS controller) services only; CodeDeploy manages blue/green rollouts
+    rolling_deployment: Optional[RollingDeploymentProps] = None
+    # CODE_DEPLOY services only; defaults apply when omitted
+    blue_green_deployment: Optional[BlueGreenDeploymentProps] = None
+    # Cluster setting; with shared_network it applies to the network-stack cluster
+    container_insights: str = 'DISABLED'
+    logging: LoggingProps = field(default_factory = LoggingProps)
+    dashboard: DashboardProps = field(default_factory = DashboardProps)
+
+    def __post_init__(self):
+        if self.deployment_controller not in DEPLOYMENT_CONTROLLERS:
+            raise ValueError(f'deployment_controller must be one of {", ".join(DEPLOYMENT_CONTROLLERS)}')
+        if self.scaling is not None and self.desired_count is not None and not (
+            self.scaling.min_capacity <= self.desired_count <= self.scaling.max_capacity
+        ):
+            raise ValueError('desired_count must lie between the scaling min and max capacity')
+        if len([provider for provider in self.capacity_providers if provider.base > 0]) > 1:
+            raise ValueError('only one capacity provider may define a base count')
+        if self.capacity_providers and not any(provider.weight > 0 for provider in self.capacity_providers):
+            raise ValueError('at least one capacity provider needs a weight above zero')
+        if self.blue_green and self.rolling_deployment is not None:
+            raise ValueError('rolling_deployment settings do not apply to the CODE_DEPLOY controller')
+        if not self.blue_green and self.blue_green_deployment is not None:
+            raise ValueError('blue_green_deployment settings only apply to the CODE_DEPLOY controller')
+        if self.cpu_architecture not in CPU_ARCHITECTURES:
+            raise ValueError(f'cpu_architecture must be one of {", ".join(CPU_ARCHITECTURES)}')
+        if self.container_insights not in CONTAINER_INSIGHTS:
+            raise ValueError(f'container_insights must be one of {", ".join(CONTAINER_INSIGHTS)}')
+        if not 0 < self.stop_timeout_seconds <= MAX_STOP_TIMEOUT_SECONDS:
+            raise ValueError(f'stop_timeout_seconds must be between 1 and {MAX_STOP_TIMEOUT_SECONDS}')
+
+    @property
+    def blue_green(self) -> bool:
+        return self.deployment_controller == 'CODE_DEPLOY'
+
+    @property
+    def task_count(self) -> int:
+        if self.desired_count is not None:
+            return self.desired_count
+        if self.scaling is not None:
+            return self.scaling.min_capacity
+        return 1
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ServiceProfile':
+        data = dict(data)
+        try:
+            if 'health_check' in data:
+                data['health_check'] = HealthCheckProps(**data['health_check'])
+            if 'load_balancer' in data:
+                data['load_balancer'] = LoadBalancerProps(**data['load_balancer'])
+            if 'edge_cache' in data:
+                data['edge_cache'] = EdgeCacheProps(**data['edge_cache'])
+            if 'container_health_check' in data:
+                data['container_health_check'] = ContainerHealthCheckProps(**data['container_health_check'])
+            if data.get('blue_green_deployment') is not None:
+                data['blue_green_deployment'] = BlueGreenDeploymentProps(**data['blue_green_deployment'])
+            if data.get('rolling_deployment') is not None:
+                data['rolling_deployment'] = RollingDeploymentProps(**data['rolling_deployment'])
+            if 'logging' in data:
+                data['logging'] = LoggingProps(**data['logging'])
+            if 'dashboard' in data:
+                data['dashboard'] = DashboardProps(**data['dashboard'])
+            if data.get('dns') is not None:
+                data['dns'] = DnsProps(**data['dns'])
+            if data.get('scaling') is not None:
+                scaling = dict(data['scaling'])
+                scaling['schedules'] = tuple(
+                    ScheduledCapacity(**schedule) for schedule in scaling.get('schedules', ())
+                )
+                data['scaling'] = ScalingProps(**scaling)
+            data['capacity_providers'] = tuple(
+                CapacityProviderProps(**provider) for provider in data.get('capacity_providers', ())
+            )
+            return cls(**data)
+        except TypeError as error:
+            raise ValueError(f'invalid service profile: {error}') from error
+
+
+def load_profile(scope: Construct, name: str) -> ServiceProfile:
+    """Load the service profile for an environment.
+
+    A profile supplied through the ``service-profiles`` CDK context (for
+    example ``cdk synth -c service-profiles='{"test": {...}}'``) takes
+    precedence over ``profiles/<name>.json``.
+    """
+    profiles = scope.node.try_get_context(PROFILES_CONTEXT_KEY) or {}
+    if isinstance(profiles, str):
+        profiles = json.loads(profiles)
+
+    if name in profiles:
+        return ServiceProfile.from_dict(profiles[name])
+
+    with open(PROFILES_DIRECTORY / f'{name}.json') as profile_file:
+        return ServiceProfile.from_dict(json.load(profile_file))
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from aws_cdk import (
+    Duration,
+    aws_applicationautoscaling as appscaling,
+    aws_ecs_patterns as ecs_patterns,
+)
+
+
+@dataclass(frozen = True)
+class ScheduledCapacity:
+    name: str
+    # Application Auto Scaling cron fields, evaluated in UTC: 'minute hour day month weekday year'
+    cron: str
+    min_capacity: int
+    max_capacity: Optional[int] = None
+
+
+@dataclass(frozen = True)
+class ScalingProps:
+    min_capacity: int = 1
+    max_capacity: int = 4
+    cpu_target_percent: Optional[int] = 50
+    memory_target_percent: Optional[int] = 70
+    requests_per_target: Optional[int] = 500
+    scale_in_cooldown_seconds: int = 120
+    scale_out_cooldown_seconds: int = 30
+    schedules: Tuple[ScheduledCapacity, ...] = ()
+
+    def __post_init__(self):
+        if self.min_capacity < 1:
+            raise ValueError('min_capacity must be at least 1')
+        if self.max_capacity < self.min_capacity:
+            raise ValueError('max_capacity must not be lower than min_capacity')
+        for schedule in self.schedules:
+            if schedule.min_capacity > (schedule.max_capacity or self.max_capacity):
+                raise ValueError(f'schedule {schedule.name} raises min_capacity above max_capacity')
+
+
+def configure_service_scaling(
+    service: ecs_patterns.ApplicationLoadBalancedFargateService,
+    props: ScalingProps,
+    blue_green: bool = False,
+) -> appscaling.ScalableTarget:
+    scalable_target = service.service.auto_scale_task_count(
+        min_capacity = props.min_capacity,
+        max_capacity = props.max_capacity
+    )
+
+    scale_in_cooldown = Duration.seconds(props.scale_in_cooldown_seconds)
+    scale_out_cooldown = Duration.seconds(props.scale_out_cooldown_seconds)
+
+    if props.cpu_target_percent:
+        scalable_target.scale_on_cpu_utilization(
+            'cpu-scaling',
+            target_utilization_percent = props.cpu_target_percent,
+            scale_in_cooldown = scale_in_cooldown,
+            scale_out_cooldown = scale_out_cooldown
+        )
+
+    if props.memory_target_percent:
+        scalable_target.scale_on_memory_utilization(
+            'memory-scaling',
+            target_utilization_percent = props.memory_target_percent,
+            scale_in_cooldown = scale_in_cooldown,
+            scale_out_cooldown = scale_out_cooldown
+        )
+
+    # CodeDeploy swaps production traffic between the blue and green target
+    # groups, so a policy bound to one of them would see zero requests after
+    # the first blue/green deployment and scale the service in.
+    if props.requests_per_target and not blue_green:
+        scalable_target.scale_on_request_count(
+            'request-count-scaling',
+            requests_per_target = props.requests_per_target,
+            target_group = service.target_group,
+            scale_in_cooldown = scale_in_cooldown,
+            scale_out_cooldown = scale_out_cooldown
+        )
+
+    # Scheduled actions raise the floor ahead of known peaks; target tracking
+    # still scales out above it and back in once the schedule lowers it again.
+    for schedule in props.schedules:
+        scalable_target.scale_on_schedule(
+            schedule.name,
+            schedule = appscaling.Schedule.expression(f'cron({schedule.cron})'),
+            min_capacity = schedule.min_capacity,
+            max_capacity = schedule.max_capacity
+        )
+
+    return scalable_target
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from constructs import Construct
+from aws_cdk import (
+    Duration,
+    Stack,
+    Tags,
+    aws_codedeploy as codedeploy,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_logs as logs,
+)
+
+HOOKS_DIRECTORY = Path(__file__).resolve().parent / 'hooks'
+# The CodeDeployHook_ prefix is what the AWSCodeDeployRoleForECS managed
+# policy allows CodeDeploy to invoke.
+HOOK_FUNCTION_NAME_PREFIX = 'CodeDeployHook_'
+MAX_FUNCTION_NAME_LENGTH = 64
+
+
+class BeforeAllowTrafficHook(Construct):
+
+    @property
+    def function_data(self):
+        return self.function
+
+    def __init__(self, scope: Construct, id: str, load_balancer: elbv2.IApplicationLoadBalancer, deployment_group: codedeploy.IEcsDeploymentGroup, test_port: int = 81, paths = ('/', '/healthcheck'), max_slowdown: float = 0.25, **kwargs) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        self.function = lambda_.Function(
+            self, 'function',
+            # One hook per blue/green stack, so each region and environment names its own
+            function_name = f'{HOOK_FUNCTION_NAME_PREFIX}{Stack.of(self).stack_name}'[:MAX_FUNCTION_NAME_LENGTH],
+            runtime = lambda_.Runtime.PYTHON_3_12,
+            handler = 'before_allow_traffic.handler',
+            code = lambda_.Code.from_asset(str(HOOKS_DIRECTORY)),
+            timeout = Duration.minutes(5),
+            log_group = logs.LogGroup(
+                self, 'log-group',
+                retention = logs.RetentionDays.ONE_MONTH
+            ),
+            environment = {
+                'BLUE_URL': f'http://{load_balancer.load_balancer_dns_name}',
+                'GREEN_URL': f'http://{load_balancer.load_balancer_dns_name}:{test_port}',
+                'WARMUP_PATHS': ','.join(paths),
+                'WARMUP_REQUESTS': '20',
+                'SAMPLE_REQUESTS': '20',
+                'MAX_SLOWDOWN': str(max_slowdown),
+                'MIN_DELTA_MS': '10'
+            }
+        )
+
+        # deploy_templates.py registers every tagged function in the generated appspec.yaml
+        Tags.of(self.function).add('codedeploy-hook', 'BeforeAllowTraffic')
+
+        self.function.add_to_role_policy(iam.PolicyStatement(
+            effect = iam.Effect.ALLOW,
+            actions = ['codedeploy:PutLifecycleEventHookExecutionStatus'],
+            resources = [deployment_group.deployment_group_arn],
+        ))
@@ -0,0 +1,26 @@
+from aws_cdk import aws_ec2 as ec2
+
+INTERFACE_ENDPOINTS = {
+    'ecr-api-endpoint': ec2.InterfaceVpcEndpointAwsService.ECR,
+    'ecr-dkr-endpoint': ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER,
+    'logs-endpoint': ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS,
+}
+
+
+def add_vpc_endpoints(vpc: ec2.Vpc) -> None:
+    # ECR serves image layers from S3, so the gateway endpoint carries the bulk
+    # of every image pull; the interface endpoints cover the registry API,
+    # the Docker registry protocol and awslogs.
+    vpc.add_gateway_endpoint(
+        's3-endpoint',
+        service = ec2.GatewayVpcEndpointAwsService.S3,
+        subnets = [ec2.SubnetSelection(subnet_type = ec2.SubnetType.PRIVATE_WITH_EGRESS)]
+    )
+
+    for endpoint_id, service in INTERFACE_ENDPOINTS.items():
+        vpc.add_interface_endpoint(
+            endpoint_id,
+            service = service,
+            private_dns_enabled = True,
+            subnets = ec2.SubnetSelection(subnet_type = ec2.SubnetType.PRIVATE_WITH_EGRESS)
+        )
@@ -1,15 +1,599 @@
+import pytest
 import aws_cdk as core
 import aws_cdk.assertions as assertions
 
 from app_cdk.app_cdk_stack import AppCdkStack
+from app_cdk.ecr_cdk_stack import EcrCdkStack
+from app_cdk.network_cdk_stack import NetworkCdkStack
+from app_cdk.service_profile import (
+    BlueGreenDeploymentProps,
+    CapacityProviderProps,
+    ContainerHealthCheckProps,
+    DashboardProps,
+    EdgeCacheProps,
+    HealthCheckProps,
+    LoadBalancerProps,
+    LoggingProps,
+    RollingDeploymentProps,
+    ServiceProfile,
+)
+from app_cdk.service_scaling import ScalingProps, ScheduledCapacity
 
-# example tests. To run these tests, uncomment this file along with the example
-# resource in app_cdk/app_cdk_stack.py
-def test_sqs_queue_created():
+
+def synth_app_stack(profile = None):
+    app = core.App()
+    ecr_stack = EcrCdkStack(app, "ecr-stack")
+    stack = AppCdkStack(app, "app-stack", ecr_repository = ecr_stack.ecr_data, profile = profile or ServiceProfile())
+    return assertions.Template.from_stack(stack)
+
+
+def test_profile_sets_task_size_health_check_and_deregistration_delay():
+    template = synth_app_stack(ServiceProfile(
+        cpu = 1024,
+        memory_limit_mib = 2048,
+        deregistration_delay_seconds = 30,
+        health_check = HealthCheckProps(path = "/healthcheck", interval_seconds = 6, timeout_seconds = 5)
+    ))
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "Cpu": "1024",
+        "Memory": "2048"
+    })
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "HealthCheckPath": "/healthcheck",
+        "HealthCheckIntervalSeconds": 6,
+        "HealthCheckTimeoutSeconds": 5,
+        "TargetGroupAttributes": assertions.Match.array_with([
+            {"Key": "deregistration_delay.timeout_seconds", "Value": "30"}
+        ])
+    })
+
+
+def test_rolling_profile_has_no_green_listener():
+    template = synth_app_stack()
+
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::Listener", 1)
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::TargetGroup", 1)
+
+
+def test_blue_green_profile_adds_green_listener_and_target_group():
+    template = synth_app_stack(ServiceProfile(deployment_controller = "CODE_DEPLOY"))
+
+    template.resource_count_is("AWS::ElasticLoadBalancingV2::TargetGroup", 2)
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::Listener", {
+        "Port": 81
+    })
+
+
+def test_default_profile_runs_on_fargate_launch_type():
+    template = synth_app_stack()
+
+    template.has_resource_properties("AWS::ECS::Service", {
+        "LaunchType": "FARGATE",
+        "CapacityProviderStrategy": assertions.Match.absent()
+    })
+
+
+def test_capacity_provider_strategy_mixes_fargate_and_spot():
+    template = synth_app_stack(ServiceProfile(
+        capacity_providers = (
+            CapacityProviderProps(capacity_provider = "FARGATE", weight = 1, base = 1),
+            CapacityProviderProps(capacity_provider = "FARGATE_SPOT", weight = 3),
+        )
+    ))
+
+    template.has_resource_properties("AWS::ECS::ClusterCapacityProviderAssociations", {
+        "CapacityProviders": assertions.Match.array_with(["FARGATE", "FARGATE_SPOT"])
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "LaunchType": assertions.Match.absent(),
+        "CapacityProviderStrategy": [
+            {"CapacityProvider": "FARGATE", "Weight": 1, "Base": 1},
+            {"CapacityProvider": "FARGATE_SPOT", "Weight": 3, "Base": 0}
+        ]
+    })
+
+
+def test_stop_timeout_and_graceful_shutdown_cover_spot_drain():
+    template = synth_app_stack(ServiceProfile(stop_timeout_seconds = 90))
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "StopTimeout": 90,
+            "Environment": assertions.Match.array_with([
+                {"Name": "GUNICORN_GRACEFUL_TIMEOUT", "Value": "85"}
+            ])
+        })]
+    })
+
+
+@pytest.mark.parametrize("architecture", ["X86_64", "ARM64"])
+def test_runtime_platform_follows_profile_architecture(architecture):
+    template = synth_app_stack(ServiceProfile(cpu_architecture = architecture))
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "RuntimePlatform": {
+            "CpuArchitecture": architecture,
+            "OperatingSystemFamily": "LINUX"
+        }
+    })
+
+
+def test_load_balancer_idle_timeout_http2_and_client_keep_alive():
+    template = synth_app_stack(ServiceProfile(
+        load_balancer = LoadBalancerProps(
+            http2_enabled = False,
+            idle_timeout_seconds = 30,
+            client_keep_alive_seconds = 600,
+            target_keep_alive_seconds = 35
+        )
+    ))
+
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::LoadBalancer", {
+        "LoadBalancerAttributes": assertions.Match.array_with([
+            {"Key": "idle_timeout.timeout_seconds", "Value": "30"},
+            {"Key": "client_keep_alive.seconds", "Value": "600"},
+            {"Key": "routing.http2.enabled", "Value": "false"}
+        ])
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Environment": assertions.Match.array_with([
+                {"Name": "GUNICORN_KEEPALIVE", "Value": "35"}
+            ])
+        })]
+    })
+
+
+def test_least_outstanding_requests_routing():
+    template = synth_app_stack(ServiceProfile(
+        load_balancer = LoadBalancerProps(routing_algorithm = "least_outstanding_requests")
+    ))
+
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "TargetGroupAttributes": assertions.Match.array_with([
+            {"Key": "load_balancing.algorithm.type", "Value": "least_outstanding_requests"}
+        ])
+    })
+
+
+def test_blue_and_green_target_groups_share_slow_start_and_health_check():
+    template = synth_app_stack(ServiceProfile(
+        deployment_controller = "CODE_DEPLOY",
+        load_balancer = LoadBalancerProps(slow_start_seconds = 60)
+    ))
+
+    target_groups = template.find_resources("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "Properties": {
+            "HealthCheckIntervalSeconds": 11,
+            "TargetGroupAttributes": assertions.Match.array_with([
+                {"Key": "deregistration_delay.timeout_seconds", "Value": "5"},
+                {"Key": "load_balancing.algorithm.type", "Value": "round_robin"},
+                {"Key": "slow_start.duration_seconds", "Value": "60"}
+            ])
+        }
+    })
+    assert len(target_groups) == 2
+
+
+def test_edge_cache_is_optional():
+    template = synth_app_stack()
+
+    template.resource_count_is("AWS::CloudFront::Distribution", 0)
+
+
+def test_edge_cache_fronts_the_load_balancer():
+    template = synth_app_stack(ServiceProfile(
+        edge_cache = EdgeCacheProps(enabled = True, origin_shield_region = "us-east-2", max_ttl_seconds = 3600)
+    ))
+
+    template.has_resource_properties("AWS::CloudFront::CachePolicy", {
+        "CachePolicyConfig": assertions.Match.object_like({
+            "MinTTL": 0,
+            "DefaultTTL": 0,
+            "MaxTTL": 3600,
+            "ParametersInCacheKeyAndForwardedToOrigin": assertions.Match.object_like({
+                "EnableAcceptEncodingGzip": True,
+                "EnableAcceptEncodingBrotli": True
+            })
+        })
+    })
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": assertions.Match.object_like({
+            "PriceClass": "PriceClass_100",
+            "DefaultCacheBehavior": assertions.Match.object_like({
+                "Compress": True
+            }),
+            "CacheBehaviors": [assertions.Match.object_like({
+                "PathPattern": "/healthcheck",
+                # Managed CachingDisabled policy
+                "CachePolicyId": "4135ea2d-6df8-44a3-9df3-4b5a84be39ad"
+            })],
+            "Origins": [assertions.Match.object_like({
+                "OriginShield": {"Enabled": True, "OriginShieldRegion": "us-east-2"},
+                "CustomOriginConfig": assertions.Match.object_like({
+                    "OriginProtocolPolicy": "http-only"
+                })
+            })]
+        })
+    })
+
+
+def test_vpc_endpoints_are_optional():
+    template = synth_app_stack()
+
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 0)
+
+
+def test_vpc_endpoints_keep_image_pulls_and_logs_off_nat():
+    template = synth_app_stack(ServiceProfile(vpc_endpoints = True))
+
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 4)
+    template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+        "VpcEndpointType": "Gateway",
+        "ServiceName": assertions.Match.object_like({
+            "Fn::Join": ["", assertions.Match.array_with([".s3"])]
+        })
+    })
+    for service in ["ecr.api", "ecr.dkr", "logs"]:
+        template.has_resource_properties("AWS::EC2::VPCEndpoint", {
+            "VpcEndpointType": "Interface",
+            "PrivateDnsEnabled": True,
+            "ServiceName": assertions.Match.object_like({
+                "Fn::Join": ["", assertions.Match.array_with([f".{service}"])]
+            })
+        })
+
+
+def test_isolated_stack_owns_its_vpc_and_cluster():
+    template = synth_app_stack()
+
+    template.resource_count_is("AWS::EC2::VPC", 1)
+    template.resource_count_is("AWS::ECS::Cluster", 1)
+
+
+def test_shared_network_stacks_only_hold_service_resources():
+    app = core.App()
+    ecr_stack = EcrCdkStack(app, "ecr-stack")
+    network_stack = NetworkCdkStack(app, "network-stack", vpc_endpoints = True)
+    app_stacks = [
+        AppCdkStack(
+            app, construct_id,
+            ecr_repository = ecr_stack.ecr_data,
+            profile = ServiceProfile(shared_network = True, vpc_endpoints = True),
+            cluster = network_stack.cluster_data
+        )
+        for construct_id in ["test-app-stack", "prod-app-stack"]
+    ]
+
+    network_template = assertions.Template.from_stack(network_stack)
+    network_template.resource_count_is("AWS::EC2::VPC", 1)
+    network_template.resource_count_is("AWS::ECS::Cluster", 1)
+    network_template.resource_count_is("AWS::EC2::VPCEndpoint", 4)
+
+    for app_stack in app_stacks:
+        template = assertions.Template.from_stack(app_stack)
+        template.resource_count_is("AWS::EC2::VPC", 0)
+        template.resource_count_is("AWS::EC2::NatGateway", 0)
+        template.resource_count_is("AWS::ECS::Cluster", 0)
+        template.resource_count_is("AWS::EC2::VPCEndpoint", 0)
+        template.resource_count_is("AWS::ECS::Service", 1)
+
+
+def test_service_without_scaling_has_no_scalable_target():
+    template = synth_app_stack()
+
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DesiredCount": 1
+    })
+
+
+def test_test_service_scales_on_cpu_memory_and_request_count():
+    template = synth_app_stack(ServiceProfile(
+        scaling = ScalingProps(min_capacity = 2, max_capacity = 6, scale_in_cooldown_seconds = 300)
+    ))
+
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DesiredCount": 2
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "MinCapacity": 2,
+        "MaxCapacity": 6,
+        "ScalableDimension": "ecs:service:DesiredCount",
+        "ServiceNamespace": "ecs"
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 3)
+    for metric_type in ["ECSServiceAverageCPUUtilization", "ECSServiceAverageMemoryUtilization", "ALBRequestCountPerTarget"]:
+        template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+                "PredefinedMetricSpecification": assertions.Match.object_like({
+                    "PredefinedMetricType": metric_type
+                }),
+                "ScaleInCooldown": 300,
+                "ScaleOutCooldown": 30
+            })
+        })
+
+
+def test_blue_green_service_skips_request_count_scaling():
+    template = synth_app_stack(ServiceProfile(
+        deployment_controller = "CODE_DEPLOY",
+        scaling = ScalingProps(min_capacity = 2, max_capacity = 10)
+    ))
+
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DeploymentController": {"Type": "CODE_DEPLOY"}
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 2)
+
+
+def test_schedules_raise_min_capacity_ahead_of_peaks():
+    template = synth_app_stack(ServiceProfile(
+        scaling = ScalingProps(
+            min_capacity = 1,
+            max_capacity = 6,
+            schedules = (
+                ScheduledCapacity(name = "morning-peak", cron = "45 8 * * ? *", min_capacity = 4),
+                ScheduledCapacity(name = "after-peak", cron = "0 11 * * ? *", min_capacity = 1),
+            )
+        )
+    ))
+
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScheduledActions": [
+            {
+                "ScalableTargetAction": {"MinCapacity": 4},
+                "Schedule": "cron(45 8 * * ? *)",
+                "ScheduledActionName": "morning-peak"
+            },
+            {
+                "ScalableTargetAction": {"MinCapacity": 1},
+                "Schedule": "cron(0 11 * * ? *)",
+                "ScheduledActionName": "after-peak"
+            }
+        ]
+    })
+
+
+def test_scaling_props_rejects_schedule_above_max_capacity():
+    with pytest.raises(ValueError):
+        ScalingProps(
+            max_capacity = 4,
+            schedules = (ScheduledCapacity(name = "peak", cron = "0 9 * * ? *", min_capacity = 6),)
+        )
+
+
+def test_scaling_props_rejects_inverted_bounds():
+    with pytest.raises(ValueError):
+        ScalingProps(min_capacity = 4, max_capacity = 2)
+
+
+def test_rolling_profile_enables_circuit_breaker_and_healthy_percent_bounds():
+    template = synth_app_stack(ServiceProfile(
+        rolling_deployment = RollingDeploymentProps(min_healthy_percent = 50, max_healthy_percent = 200)
+    ))
+
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DeploymentConfiguration": {
+            "MinimumHealthyPercent": 50,
+            "MaximumPercent": 200,
+            "DeploymentCircuitBreaker": {"Enable": True, "Rollback": True}
+        }
+    })
+
+
+def test_container_health_check_start_period_follows_measured_startup():
+    template = synth_app_stack(ServiceProfile(
+        container_health_check = ContainerHealthCheckProps(measured_startup_seconds = 10)
+    ))
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "HealthCheck": {
+                "Command": ["CMD-SHELL", "wget -q -O /dev/null http://localhost:8081/healthcheck || exit 1"],
+                "Interval": 5,
+                "Timeout": 2,
+                "Retries": 2,
+                "StartPeriod": 15
+            }
+        })]
+    })
+
+
+def test_default_logging_is_non_blocking_with_bounded_retention():
+    template = synth_app_stack()
+
+    template.has_resource_properties("AWS::Logs::LogGroup", {
+        "RetentionInDays": 30
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "LogConfiguration": {
+                "LogDriver": "awslogs",
+                "Options": assertions.Match.object_like({
+                    "mode": "non-blocking",
+                    # CDK renders Size values in bytes
+                    "max-buffer-size": f"{25 * 1024 * 1024}b"
+                })
+            }
+        })]
+    })
+
+
+def test_firelens_router_buffers_and_filters_health_checks():
+    template = synth_app_stack(ServiceProfile(
+        logging = LoggingProps(driver = "firelens", retention = "ONE_WEEK", firelens_buffer_limit_bytes = 1048576)
+    ))
+
+    template.has_resource_properties("AWS::Logs::LogGroup", {
+        "RetentionInDays": 7
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "my-app",
+                "LogConfiguration": {
+                    "LogDriver": "awsfirelens",
+                    "Options": assertions.Match.object_like({
+                        "Name": "cloudwatch_logs",
+                        "log-driver-buffer-limit": "1048576"
+                    })
+                }
+            }),
+            assertions.Match.object_like({
+                "Name": "log-router",
+                "Cpu": 32,
+                "MemoryReservation": 50,
+                "FirelensConfiguration": {
+                    "Type": "fluentbit",
+                    "Options": {
+                        "config-file-type": "file",
+                        "config-file-value": "/fluent-bit/etc/filters.conf"
+                    }
+                }
+            })
+        ]
+    })
+
+
+def test_container_insights_is_configurable_on_the_cluster():
+    template = synth_app_stack(ServiceProfile(container_insights = "ENHANCED"))
+
+    template.has_resource_properties("AWS::ECS::Cluster", {
+        "ClusterSettings": [{"Name": "containerInsights", "Value": "enhanced"}]
+    })
+
+
+def test_image_tag_can_be_pinned():
     app = core.App()
-    stack = AppCdkStack(app, "app-cdk")
+    ecr_stack = EcrCdkStack(app, "ecr-stack")
+    stack = AppCdkStack(
+        app, "app-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        profile = ServiceProfile(),
+        image_tag = "commit-0123abc"
+    )
+
     template = assertions.Template.from_stack(stack)
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [assertions.Match.object_like({
+            "Image": assertions.Match.object_like({
+                "Fn::Join": ["", assertions.Match.array_with([":commit-0123abc"])]
+            })
+        })]
+    })
+
+
+def test_blue_green_stack_registers_before_allow_traffic_hook():
+    template = synth_app_stack(ServiceProfile(deployment_controller = "CODE_DEPLOY"))
+
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "FunctionName": "CodeDeployHook_app-stack",
+        "Handler": "before_allow_traffic.handler",
+        "Environment": {
+            "Variables": assertions.Match.object_like({
+                "GREEN_URL": {
+                    "Fn::Join": ["", assertions.Match.array_with([":81"])]
+                }
+            })
+        }
+    })
+    template.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {
+            "Statement": assertions.Match.array_with([
+                assertions.Match.object_like({"Action": "codedeploy:PutLifecycleEventHookExecutionStatus"})
+            ])
+        }
+    })
+
+
+def test_rolling_stack_has_no_traffic_hook():
+    template = synth_app_stack()
+
+    assert not template.find_resources("AWS::Lambda::Function", {
+        "Properties": {"Handler": "before_allow_traffic.handler"}
+    })
+
+
+def test_blue_green_canary_rolls_back_on_latency_and_error_alarms():
+    template = synth_app_stack(ServiceProfile(
+        deployment_controller = "CODE_DEPLOY",
+        blue_green_deployment = BlueGreenDeploymentProps(
+            deployment_config = "CANARY_10_PERCENT_5_MINUTES",
+            p99_latency_threshold_seconds = 0.5
+        )
+    ))
+
+    template.has_resource_properties("AWS::CodeDeploy::DeploymentGroup", {
+        "DeploymentConfigName": "CodeDeployDefault.ECSCanary10Percent5Minutes",
+        "AlarmConfiguration": assertions.Match.object_like({
+            "Enabled": True,
+            "Alarms": assertions.Match.array_with([assertions.Match.object_like({"Name": assertions.Match.any_value()})])
+        }),
+        "AutoRollbackConfiguration": assertions.Match.object_like({"Enabled": True})
+    })
+    deployment_group = next(iter(template.find_resources("AWS::CodeDeploy::DeploymentGroup").values()))
+    assert len(deployment_group["Properties"]["AlarmConfiguration"]["Alarms"]) == 4
+    rollback_events = deployment_group["Properties"]["AutoRollbackConfiguration"]["Events"]
+    assert "DEPLOYMENT_FAILURE" in rollback_events
+    assert "DEPLOYMENT_STOP_ON_ALARM" in rollback_events
+    # p99 latency and 5xx rate, for both the blue and the green target group
+    template.resource_count_is("AWS::CloudWatch::Alarm", 4)
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "MetricName": "TargetResponseTime",
+        "ExtendedStatistic": "p99",
+        "Threshold": 0.5
+    })
+
+
+def dashboard_body(template):
+    dashboard = next(iter(template.find_resources("AWS::CloudWatch::Dashboard").values()))
+    return "".join(part for part in dashboard["Properties"]["DashboardBody"]["Fn::Join"][1] if isinstance(part, str))
+
+
+def test_dashboard_shows_latency_traffic_host_health_and_task_metrics():
+    template = synth_app_stack(ServiceProfile(
+        deployment_controller = "CODE_DEPLOY",
+        dashboard = DashboardProps(period_seconds = 120, latency_target_seconds = 0.5)
+    ))
+
+    template.has_resource_properties("AWS::CloudWatch::Dashboard", {
+        "DashboardName": "app-stack-performance"
+    })
+    body = dashboard_body(template)
+    for metric_name in [
+        "TargetResponseTime", "RequestCount", "HTTPCode_Target_5XX_Count", "HealthyHostCount",
+        "CPUUtilization", "MemoryUtilization"
+    ]:
+        assert f'"{metric_name}"' in body
+    for statistic in ["p50", "p90", "p99"]:
+        assert f'"stat":"{statistic}"' in body
+    assert '"label":"blue"' in body and '"label":"green"' in body
+    assert '"period":120' in body
+    assert '"horizontal":[' in body and '"value":0.5' in body
+
+
+def test_dashboard_task_counts_come_from_container_insights_when_enabled():
+    template = synth_app_stack(ServiceProfile(container_insights = "ENABLED"))
+
+    body = dashboard_body(template)
+    assert '"ECS/ContainerInsights","RunningTaskCount"' in body
+    assert '"DesiredTaskCount"' in body
+
+
+def test_dashboard_counts_tasks_from_ecs_metrics_without_container_insights():
+    template = synth_app_stack(ServiceProfile(dashboard = DashboardProps(period_seconds = 120)))
+
+    body = dashboard_body(template)
+    assert "ECS/ContainerInsights" not in body
+    assert '"expression":"cpu_samples / 2"' in body
+    assert '"label":"running"' in body
+    assert '"stat":"SampleCount"' in body
+
+
+def test_dashboard_can_be_disabled_per_environment():
+    template = synth_app_stack(ServiceProfile(dashboard = DashboardProps(enabled = False)))
 
-#     template.has_resource_properties("AWS::SQS::Queue", {
-#         "VisibilityTimeout": 300
-#     })
+    template.resource_count_is("AWS::CloudWatch::Dashboard", 0)
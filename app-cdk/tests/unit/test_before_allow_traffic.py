@@ -0,0 +1,97 @@
+import pytest
+
+from app_cdk.hooks import before_allow_traffic
+from app_cdk.hooks.before_allow_traffic import OutOfTime, compare_latency, evaluate, handler, warm_up
+
+
+def fake_get(latencies_ms, failing = ()):
+    calls = []
+
+    def get(url):
+        calls.append(url)
+        if any(url.startswith(prefix) for prefix in failing):
+            return 503, 1.0
+        colour = "green" if ":81" in url else "blue"
+        return 200, latencies_ms[colour]
+
+    get.calls = calls
+    return get
+
+
+def test_warm_up_only_hits_the_test_listener():
+    get = fake_get({"green": 5.0, "blue": 5.0})
+
+    errors = warm_up("http://alb:81", ["/", "/healthcheck"], 3, get)
+
+    assert errors == 0
+    assert len(get.calls) == 6
+    assert all(url.startswith("http://alb:81") for url in get.calls)
+
+
+def test_green_within_slowdown_passes():
+    passed, summary = compare_latency([20.0] * 10, [24.0] * 10, max_slowdown = 0.25, min_delta_ms = 1)
+
+    assert passed
+    assert summary["limit_ms"] == 25.0
+
+
+def test_green_much_slower_than_blue_fails():
+    passed, _ = compare_latency([20.0] * 10, [40.0] * 10, max_slowdown = 0.25, min_delta_ms = 1)
+
+    assert not passed
+
+
+def test_small_absolute_differences_are_tolerated():
+    passed, _ = compare_latency([2.0] * 10, [8.0] * 10, max_slowdown = 0.25, min_delta_ms = 10)
+
+    assert passed
+
+
+def test_green_errors_fail_the_deployment():
+    passed, summary = evaluate(
+        "http://alb", "http://alb:81", ["/"], 2, 5, 0.25, 10,
+        get = fake_get({"green": 5.0, "blue": 5.0}, failing = ["http://alb:81"])
+    )
+
+    assert not passed
+    assert summary["warmup_errors"] == 2
+    assert summary["green_errors"] == 5
+
+
+def test_healthy_green_passes():
+    passed, summary = evaluate(
+        "http://alb", "http://alb:81", ["/", "/healthcheck"], 2, 5, 0.25, 10,
+        get = fake_get({"green": 12.0, "blue": 10.0})
+    )
+
+    assert passed
+    assert summary["green_p90_ms"] == 12.0
+
+
+def test_evaluation_stops_at_the_deadline():
+    get = fake_get({"green": 12.0, "blue": 10.0})
+    ticks = iter(range(100))
+
+    with pytest.raises(OutOfTime):
+        evaluate(
+            "http://alb", "http://alb:81", ["/"], 20, 20, 0.25, 10,
+            get = get, deadline = 5, clock = lambda: next(ticks)
+        )
+
+    assert len(get.calls) == 5
+
+
+def test_handler_reports_failed_before_the_lambda_times_out(monkeypatch):
+    class Context:
+        def get_remaining_time_in_millis(self):
+            return before_allow_traffic.REPORT_MARGIN_SECONDS * 1000
+
+    reported = []
+    monkeypatch.setattr(before_allow_traffic, "report_status", lambda event, status: reported.append(status))
+    monkeypatch.setenv("BLUE_URL", "http://alb")
+    monkeypatch.setenv("GREEN_URL", "http://alb:81")
+
+    summary = handler({"DeploymentId": "d-1", "LifecycleEventHookExecutionId": "h-1"}, Context())
+
+    assert summary == {"timed_out": True}
+    assert reported == ["Failed"]
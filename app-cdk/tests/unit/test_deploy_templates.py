@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from app_cdk.deploy_templates import (
+    IMAGE_PLACEHOLDER,
+    TASK_DEFINITION_PLACEHOLDER,
+    appspec_document,
+    hook_functions,
+    load_balancer_target,
+    main,
+    physical_id,
+    task_definition_document,
+    task_definition_logical_id,
+)
+
+TEMPLATE = {
+    "Resources": {
+        "prodappfargateServiceA1B2": {
+            "Type": "AWS::ECS::Service",
+            "Properties": {
+                "DeploymentController": {"Type": "CODE_DEPLOY"},
+                "TaskDefinition": {"Ref": "prodappfargateTaskDefC3D4"},
+                "LoadBalancers": [{"ContainerName": "my-app", "ContainerPort": 8081}]
+            }
+        },
+        "prodappfargateTaskDefC3D4": {"Type": "AWS::ECS::TaskDefinition", "Properties": {}},
+        "beforeallowtrafficFunctionE5F6": {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {
+                "FunctionName": "CodeDeployHook_prod-app-stack",
+                "Tags": [{"Key": "codedeploy-hook", "Value": "BeforeAllowTraffic"}]
+            }
+        },
+        "otherFunction": {"Type": "AWS::Lambda::Function", "Properties": {"FunctionName": "other"}}
+    }
+}
+
+STACK_RESOURCES = {
+    "StackResources": [
+        {"LogicalResourceId": "prodappfargateServiceA1B2", "PhysicalResourceId": "arn:aws:ecs:us-east-2:123456789012:service/prod/my-app"},
+        {"LogicalResourceId": "prodappfargateTaskDefC3D4", "PhysicalResourceId": "arn:aws:ecs:us-east-2:123456789012:task-definition/prod-app:7"}
+    ]
+}
+
+DESCRIBED_TASK_DEFINITION = {
+    "taskDefinition": {
+        "taskDefinitionArn": "arn:aws:ecs:us-east-2:123456789012:task-definition/prod-app:7",
+        "family": "prod-app",
+        "revision": 7,
+        "status": "ACTIVE",
+        "requiresAttributes": [{"name": "ecs.capability.execution-role-awslogs"}],
+        "compatibilities": ["EC2", "FARGATE"],
+        "registeredAt": "2026-10-01T12:00:00Z",
+        "registeredBy": "arn:aws:sts::123456789012:assumed-role/cdk",
+        "cpu": "1024",
+        "memory": "2048",
+        "networkMode": "awsvpc",
+        "runtimePlatform": {"cpuArchitecture": "ARM64", "operatingSystemFamily": "LINUX"},
+        "containerDefinitions": [
+            {"name": "my-app", "image": "123456789012.dkr.ecr.us-east-2.amazonaws.com/my-app:latest", "portMappings": [{"containerPort": 8081}]},
+            {"name": "log-router", "image": "123456789012.dkr.ecr.us-east-2.amazonaws.com/cdk-assets:abc"}
+        ]
+    }
+}
+
+
+def test_task_definition_arn_is_the_revision_cdk_registered():
+    logical_id = task_definition_logical_id(TEMPLATE)
+
+    assert logical_id == "prodappfargateTaskDefC3D4"
+    assert physical_id(STACK_RESOURCES, logical_id).endswith("task-definition/prod-app:7")
+
+
+def test_template_without_a_blue_green_service_is_rejected():
+    template = {"Resources": {"service": {"Type": "AWS::ECS::Service", "Properties": {}}}}
+
+    with pytest.raises(ValueError):
+        task_definition_logical_id(template)
+
+
+def test_task_definition_keeps_cdk_settings_and_templates_the_app_image():
+    document = task_definition_document(DESCRIBED_TASK_DEFINITION, "my-app")
+
+    assert "taskDefinitionArn" not in document and "revision" not in document and "status" not in document
+    assert document["cpu"] == "1024" and document["memory"] == "2048"
+    assert document["runtimePlatform"]["cpuArchitecture"] == "ARM64"
+    images = {container["name"]: container["image"] for container in document["containerDefinitions"]}
+    assert images["my-app"] == IMAGE_PLACEHOLDER
+    assert images["log-router"].endswith("cdk-assets:abc")
+    assert DESCRIBED_TASK_DEFINITION["taskDefinition"]["containerDefinitions"][0]["image"].endswith(":latest")
+
+
+def test_appspec_targets_the_service_container_and_registers_tagged_hooks():
+    container_name, container_port = load_balancer_target(TEMPLATE)
+    appspec = appspec_document(container_name, container_port, hook_functions(TEMPLATE))
+
+    target = appspec["Resources"][0]["TargetService"]["Properties"]
+    assert target["TaskDefinition"] == TASK_DEFINITION_PLACEHOLDER
+    assert target["LoadBalancerInfo"] == {"ContainerName": "my-app", "ContainerPort": 8081}
+    assert appspec["Hooks"] == [{"BeforeAllowTraffic": "CodeDeployHook_prod-app-stack"}]
+
+
+def test_generate_writes_both_templates(tmp_path):
+    template_path = tmp_path / "template.json"
+    task_definition_path = tmp_path / "task-definition.json"
+    template_path.write_text(json.dumps(TEMPLATE))
+    task_definition_path.write_text(json.dumps(DESCRIBED_TASK_DEFINITION))
+
+    main(["generate", str(template_path), str(task_definition_path), "--output-dir", str(tmp_path / "prod-app-stack")])
+
+    taskdef = json.loads((tmp_path / "prod-app-stack" / "taskdef.json").read_text())
+    appspec = json.loads((tmp_path / "prod-app-stack" / "appspec.yaml").read_text())
+    assert taskdef["family"] == "prod-app"
+    assert appspec["Hooks"][0]["BeforeAllowTraffic"].startswith("CodeDeployHook_")
\ No newline at end of file
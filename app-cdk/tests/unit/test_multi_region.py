@@ -0,0 +1,178 @@
+import json
+
+import pytest
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+
+from app_cdk.app_cdk_stack import AppCdkStack
+from app_cdk.artifact_replication_cdk_stack import ArtifactReplicationCdkStack
+from app_cdk.ecr_cdk_stack import EcrCdkStack
+from app_cdk.pipeline_cdk_stack import PipelineCdkStack
+from app_cdk.service_profile import DnsProps, ServiceProfile
+
+ACCOUNT = "111111111111"
+HOME_REGION = "us-east-2"
+REPLICA_REGIONS = ["eu-west-1", "ap-southeast-2"]
+
+
+@pytest.fixture(autouse = True)
+def default_region(monkeypatch):
+    monkeypatch.setenv("CDK_DEFAULT_REGION", HOME_REGION)
+
+
+@pytest.fixture
+def stacks():
+    app = core.App()
+    env = lambda region: core.Environment(account = ACCOUNT, region = region)
+    profile = ServiceProfile(
+        deployment_controller = "CODE_DEPLOY",
+        dns = DnsProps(hosted_zone_id = "Z0123456789", zone_name = "example.com", record_name = "app.example.com")
+    )
+
+    ecr_stack = EcrCdkStack(app, "ecr-stack", replication_regions = REPLICA_REGIONS, env = env(HOME_REGION))
+    test_app_stack = AppCdkStack(
+        app, "test-app-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        profile = ServiceProfile(),
+        env = env(HOME_REGION)
+    )
+    prod_app_stacks = {
+        region: AppCdkStack(
+            app, "prod-app-stack" if region == HOME_REGION else f"prod-app-stack-{region}",
+            ecr_repository = ecr_stack.ecr_data,
+            profile = profile,
+            env = env(region)
+        )
+        for region in [HOME_REGION] + REPLICA_REGIONS
+    }
+    replication_stacks = {
+        region: ArtifactReplicationCdkStack(app, f"artifact-replication-stack-{region}", env = env(region))
+        for region in REPLICA_REGIONS
+    }
+    pipeline_stack = PipelineCdkStack(
+        app, "pipeline-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        cache_repository = ecr_stack.cache_data,
+        test_app_fargate = test_app_stack.ecs_service_data,
+        prod_deployment_waves = [
+            [prod_app_stacks[HOME_REGION].deployment_group_data],
+            [prod_app_stacks[region].deployment_group_data for region in REPLICA_REGIONS],
+        ],
+        cross_region_replication_buckets = {
+            region: replication_stack.bucket_data for region, replication_stack in replication_stacks.items()
+        },
+        env = env(HOME_REGION)
+    )
+    return {
+        "app": app,
+        "ecr": ecr_stack,
+        "prod": prod_app_stacks,
+        "pipeline": pipeline_stack,
+        "replication": replication_stacks,
+    }
+
+
+def test_ecr_replicates_to_every_other_region(stacks):
+    template = assertions.Template.from_stack(stacks["ecr"])
+
+    template.has_resource_properties("AWS::ECR::ReplicationConfiguration", {
+        "ReplicationConfiguration": {
+            "Rules": [assertions.Match.object_like({
+                "Destinations": [
+                    {"Region": "eu-west-1", "RegistryId": ACCOUNT},
+                    {"Region": "ap-southeast-2", "RegistryId": ACCOUNT}
+                ]
+            })]
+        }
+    })
+
+
+def test_regional_stack_pulls_from_replicated_repository(stacks):
+    template = assertions.Template.from_stack(stacks["prod"]["eu-west-1"])
+
+    task_definition = next(iter(template.find_resources("AWS::ECS::TaskDefinition").values()))
+    image = json.dumps(task_definition["Properties"]["ContainerDefinitions"][0]["Image"])
+    assert f"{ACCOUNT}.dkr.ecr.eu-west-1." in image
+    assert "Fn::ImportValue" not in image
+
+
+@pytest.mark.parametrize("region", [HOME_REGION] + REPLICA_REGIONS)
+def test_latency_record_per_region(stacks, region):
+    template = assertions.Template.from_stack(stacks["prod"][region])
+
+    template.has_resource_properties("AWS::Route53::RecordSet", {
+        "Name": "app.example.com.",
+        "Type": "A",
+        "Region": region,
+        "SetIdentifier": assertions.Match.string_like_regexp(region),
+        "HostedZoneId": "Z0123456789"
+    })
+    template.resource_count_is("AWS::CodeDeploy::DeploymentGroup", 1)
+
+
+def test_pipeline_deploys_regions_in_waves(stacks):
+    template = assertions.Template.from_stack(stacks["pipeline"])
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "Name": "Deploy-Production",
+                "Actions": [
+                    assertions.Match.object_like({"Name": "Approve-Prod-Deploy"}),
+                    assertions.Match.object_like({"Name": f"BlueGreen-{HOME_REGION}"})
+                ]
+            }),
+            assertions.Match.object_like({
+                "Name": "Deploy-Production-Wave-2",
+                "Actions": [
+                    assertions.Match.object_like({"Name": "BlueGreen-eu-west-1", "Region": "eu-west-1"}),
+                    assertions.Match.object_like({"Name": "BlueGreen-ap-southeast-2", "Region": "ap-southeast-2"})
+                ]
+            })
+        ])
+    })
+
+
+def test_replica_regions_deploy_the_image_from_their_own_repository(stacks):
+    template = assertions.Template.from_stack(stacks["pipeline"])
+
+    pipeline = next(iter(template.find_resources("AWS::CodePipeline::Pipeline").values()))
+    actions = {
+        action["Name"]: action
+        for stage in pipeline["Properties"]["Stages"]
+        for action in stage["Actions"]
+    }
+
+    for region in REPLICA_REGIONS:
+        image_detail = actions[f"Image-Detail-{region}"]
+        assert image_detail["RunOrder"] == 3
+        assert image_detail["OutputArtifacts"] == [{"Name": f"image_detail_{region}"}]
+        assert {"Name": f"image_detail_{region}"} in actions[f"BlueGreen-{region}"]["InputArtifacts"]
+        assert "IMAGE_DIGEST" in json.dumps(image_detail["Configuration"]["EnvironmentVariables"])
+    assert f"Image-Detail-{HOME_REGION}" not in actions
+    assert not [
+        artifact for artifact in actions[f"BlueGreen-{HOME_REGION}"]["InputArtifacts"]
+        if artifact["Name"].startswith("image_detail_")
+    ]
+
+
+def test_app_synthesizes_with_replication_buckets_outside_the_app_stacks(stacks):
+    # A cyclic reference between stacks fails here
+    assembly = stacks["app"].synth()
+
+    pipeline_dependencies = {stack.stack_name for stack in stacks["pipeline"].dependencies}
+    assert {f"artifact-replication-stack-{region}" for region in REPLICA_REGIONS} <= pipeline_dependencies
+    for region in REPLICA_REGIONS:
+        assert "pipeline-stack" not in {stack.stack_name for stack in stacks["prod"][region].dependencies}
+        prod_resources = assembly.get_stack_by_name(f"prod-app-stack-{region}").template["Resources"]
+        assert not [logical_id for logical_id in prod_resources if "ReplicationBucket" in logical_id]
+        # The replication bucket grants name the cross-region action roles literally
+        replication_template = assembly.get_stack_by_name(f"artifact-replication-stack-{region}").template
+        assert "Fn::ImportValue" not in json.dumps(replication_template)
+        assert "pipeline-stack" not in {stack.stack_name for stack in stacks["replication"][region].dependencies}
+
+    template = assertions.Template.from_stack(stacks["pipeline"])
+    for region in REPLICA_REGIONS:
+        template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+            "ArtifactStores": assertions.Match.array_with([assertions.Match.object_like({"Region": region})])
+        })
@@ -0,0 +1,113 @@
+import pytest
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_logs as logs,
+)
+
+from app_cdk.performance_guardrails import GuardrailRules, PerformanceGuardrails
+
+
+def annotations_for(build, rules = None):
+    app = core.App()
+    stack = core.Stack(app, "guarded-stack")
+    build(stack)
+    core.Aspects.of(stack).add(PerformanceGuardrails(rules))
+    return assertions.Annotations.from_stack(stack)
+
+
+def fargate_service(stack, image = "my-app:1.0", environment = None, scaling = True):
+    vpc = ec2.Vpc(stack, "vpc")
+    task_definition = ecs.FargateTaskDefinition(stack, "task")
+    task_definition.add_container("app", image = ecs.ContainerImage.from_registry(image), environment = environment)
+    service = ecs.FargateService(
+        stack, "service",
+        cluster = ecs.Cluster(stack, "cluster", vpc = vpc),
+        task_definition = task_definition
+    )
+    if scaling:
+        service.auto_scale_task_count(max_capacity = 4).scale_on_cpu_utilization("cpu", target_utilization_percent = 50)
+    return service
+
+
+def test_service_without_scaling_is_an_error():
+    annotations = annotations_for(lambda stack: fargate_service(stack, scaling = False))
+
+    annotations.has_error("*", assertions.Match.string_like_regexp("service_scaling"))
+
+
+def test_service_with_scaling_passes():
+    annotations = annotations_for(fargate_service)
+
+    annotations.has_no_error("*", assertions.Match.any_value())
+
+
+def test_debug_mode_is_an_error():
+    annotations = annotations_for(lambda stack: fargate_service(stack, environment = {"FLASK_DEBUG": "1"}))
+
+    annotations.has_error("*", assertions.Match.string_like_regexp("FLASK_DEBUG"))
+
+
+def test_debug_rule_can_be_turned_off():
+    annotations = annotations_for(
+        lambda stack: fargate_service(stack, environment = {"FLASK_DEBUG": "1"}),
+        GuardrailRules(debug_mode = "off")
+    )
+
+    annotations.has_no_error("*", assertions.Match.any_value())
+
+
+def test_latest_image_tag_is_a_warning():
+    annotations = annotations_for(lambda stack: fargate_service(stack, image = "my-app:latest"))
+
+    annotations.has_warning("*", assertions.Match.string_like_regexp("latest"))
+
+
+def test_pinned_image_tag_passes():
+    annotations = annotations_for(fargate_service)
+
+    annotations.has_no_warning("*", assertions.Match.string_like_regexp("latest"))
+
+
+def test_long_health_check_interval_is_a_warning():
+    def build(stack):
+        target_group = elbv2.ApplicationTargetGroup(stack, "target-group", port = 80, vpc = ec2.Vpc(stack, "vpc"))
+        target_group.configure_health_check(interval = core.Duration.seconds(30))
+
+    annotations_for(build).has_warning("*", assertions.Match.string_like_regexp("health check interval"))
+    annotations_for(build, GuardrailRules(max_health_check_interval_seconds = 30)).has_no_warning(
+        "*", assertions.Match.string_like_regexp("health check interval")
+    )
+
+
+def test_log_group_without_retention_is_a_warning():
+    def build(stack):
+        logs.LogGroup(stack, "forever", retention = logs.RetentionDays.INFINITE)
+
+    annotations_for(build).has_warning("*", assertions.Match.string_like_regexp("retention"))
+
+
+def test_log_group_with_retention_passes():
+    def build(stack):
+        logs.LogGroup(stack, "bounded", retention = logs.RetentionDays.ONE_WEEK)
+
+    annotations_for(build).has_no_warning("*", assertions.Match.string_like_regexp("retention"))
+
+
+def test_rules_come_from_context():
+    app = core.App(context = {"performance-guardrails": {"mutable_image_tag": "error"}})
+
+    assert GuardrailRules.from_context(app).mutable_image_tag == "error"
+
+
+@pytest.mark.parametrize("context", [
+    {"service_scaling": "fatal"},
+    {"unknown_rule": "off"},
+    {"max_health_check_interval_seconds": 1},
+])
+def test_invalid_rules_are_rejected(context):
+    with pytest.raises(ValueError):
+        GuardrailRules.from_context(core.App(context = {"performance-guardrails": context}))
@@ -0,0 +1,299 @@
+import pytest
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+
+from app_cdk.app_cdk_stack import AppCdkStack
+from app_cdk.ecr_cdk_stack import EcrCdkStack
+from app_cdk.pipeline_cdk_stack import PipelineCdkStack
+from app_cdk.service_profile import ServiceProfile
+
+
+@pytest.fixture(autouse = True)
+def default_region(monkeypatch):
+    monkeypatch.setenv("CDK_DEFAULT_REGION", "us-east-2")
+
+
+def synth_pipeline_stack(**kwargs):
+    app = core.App()
+    ecr_stack = EcrCdkStack(app, "ecr-stack")
+    test_app_stack = AppCdkStack(
+        app, "test-app-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        profile = ServiceProfile()
+    )
+    prod_app_stack = AppCdkStack(
+        app, "prod-app-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        profile = ServiceProfile(deployment_controller = "CODE_DEPLOY")
+    )
+    stack = PipelineCdkStack(
+        app, "pipeline-stack",
+        ecr_repository = ecr_stack.ecr_data,
+        cache_repository = ecr_stack.cache_data,
+        test_app_fargate = test_app_stack.ecs_service_data,
+        prod_deployment_waves = [[prod_app_stack.deployment_group_data]],
+        **kwargs
+    )
+    return assertions.Template.from_stack(stack)
+
+
+def test_single_region_prod_deploy_follows_manual_approval():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "Name": "Deploy-Production",
+                "Actions": [
+                    assertions.Match.object_like({"Name": "Approve-Prod-Deploy", "RunOrder": 1}),
+                    assertions.Match.object_like({"Name": "ABlueGreen-deployECS", "RunOrder": 2})
+                ]
+            })
+        ])
+    })
+
+
+def test_docker_build_targets_both_architectures_on_x86_builders():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "Type": "LINUX_CONTAINER",
+            "Image": "aws/codebuild/standard:5.0",
+            "EnvironmentVariables": assertions.Match.array_with([
+                {"Name": "IMAGE_PLATFORMS", "Type": "PLAINTEXT", "Value": "linux/amd64,linux/arm64"}
+            ])
+        })
+    })
+
+
+def test_docker_build_generates_soci_index_by_default():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "EnvironmentVariables": assertions.Match.array_with([
+                {"Name": "SOCI_INDEX", "Type": "PLAINTEXT", "Value": "enabled"}
+            ])
+        })
+    })
+
+
+def test_soci_index_can_be_disabled():
+    template = synth_pipeline_stack(soci_index = False)
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "EnvironmentVariables": assertions.Match.array_with([
+                {"Name": "SOCI_INDEX", "Type": "PLAINTEXT", "Value": "disabled"}
+            ])
+        })
+    })
+
+
+def test_arm_build_architecture_uses_graviton_build_images():
+    template = synth_pipeline_stack(build_architecture = "ARM64")
+
+    projects = template.find_resources("AWS::CodeBuild::Project")
+    assert projects
+    for project in projects.values():
+        environment = project["Properties"]["Environment"]
+        assert environment["Type"] == "ARM_CONTAINER"
+        assert environment["Image"] == "aws/codebuild/amazonlinux2-aarch64-standard:3.0"
+
+
+def test_unit_tests_and_image_build_run_in_parallel_before_promotion():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "Name": "Build-And-Test",
+                "Actions": [
+                    assertions.Match.object_like({"Name": "Unit-Test", "RunOrder": 1}),
+                    assertions.Match.object_like({"Name": "Docker-Build", "RunOrder": 1}),
+                    assertions.Match.object_like({"Name": "Generate-Deploy-Templates", "RunOrder": 1}),
+                    assertions.Match.object_like({"Name": "Promote", "RunOrder": 2})
+                ]
+            })
+        ])
+    })
+
+    pipeline = next(iter(template.find_resources("AWS::CodePipeline::Pipeline").values()))
+    stage_names = [stage["Name"] for stage in pipeline["Properties"]["Stages"]]
+    assert stage_names[:5] == ["Source", "Package", "Build-And-Test", "Deploy-Test", "Performance-Gate"]
+
+
+def test_docker_build_caches_source_locally_and_layers_in_registry():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Cache": {
+            "Type": "LOCAL",
+            "Modes": ["LOCAL_SOURCE_CACHE"]
+        },
+        "Environment": assertions.Match.object_like({
+            "EnvironmentVariables": assertions.Match.array_with([
+                assertions.Match.object_like({"Name": "CACHE_REPO_URI"})
+            ])
+        })
+    })
+
+
+def test_pipeline_only_triggers_on_app_and_deploy_file_changes():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Triggers": [{
+            "ProviderType": "CodeStarSourceConnection",
+            "GitConfiguration": {
+                "SourceActionName": "GitHub",
+                "Push": [{
+                    "Branches": {"Includes": ["main"]},
+                    "FilePaths": {"Includes": ["my-app/**", "buildspec_*.yml", "app-cdk/app_cdk/deploy_templates.py"]}
+                }]
+            }
+        }]
+    })
+
+
+def test_trigger_file_filter_can_be_disabled():
+    template = synth_pipeline_stack(trigger_file_paths = ())
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Triggers": assertions.Match.absent()
+    })
+
+
+def test_blue_green_deploy_takes_the_promoted_image_digest():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "Name": "Deploy-Production",
+                "Actions": assertions.Match.array_with([
+                    assertions.Match.object_like({
+                        "Name": "ABlueGreen-deployECS",
+                        "Configuration": assertions.Match.object_like({
+                            "Image1ContainerName": "IMAGE1_NAME"
+                        })
+                    })
+                ])
+            })
+        ])
+    })
+
+
+def test_later_actions_only_download_packaged_artifacts():
+    template = synth_pipeline_stack()
+
+    pipeline = next(iter(template.find_resources("AWS::CodePipeline::Pipeline").values()))
+    actions = {
+        action["Name"]: action
+        for stage in pipeline["Properties"]["Stages"]
+        for action in stage["Actions"]
+    }
+
+    assert [artifact["Name"] for artifact in actions["Package-Artifacts"]["OutputArtifacts"]] == ["app_source"]
+    for name in ["Unit-Test", "Docker-Build", "Generate-Deploy-Templates", "Promote"]:
+        assert actions[name]["InputArtifacts"] == [{"Name": "app_source"}]
+    assert {artifact["Name"] for artifact in actions["ABlueGreen-deployECS"]["InputArtifacts"]} == {
+        "deploy_templates",
+        actions["Promote"]["OutputArtifacts"][0]["Name"]
+    }
+
+
+def test_deploy_templates_are_generated_per_prod_stack():
+    template = synth_pipeline_stack()
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "EnvironmentVariables": assertions.Match.array_with([
+                assertions.Match.object_like({"Name": "PROD_STACKS"})
+            ])
+        })
+    })
+    template.has_resource_properties("AWS::CodePipeline::Pipeline", {
+        "Stages": assertions.Match.array_with([
+            assertions.Match.object_like({
+                "Name": "Deploy-Production",
+                "Actions": assertions.Match.array_with([
+                    assertions.Match.object_like({
+                        "Name": "ABlueGreen-deployECS",
+                        "Configuration": assertions.Match.object_like({
+                            "AppSpecTemplatePath": "prod-app-stack/appspec.yaml",
+                            "TaskDefinitionTemplatePath": "prod-app-stack/taskdef.json"
+                        })
+                    })
+                ])
+            })
+        ])
+    })
+
+
+def test_performance_gate_runs_before_prod_and_baseline_is_recorded_after():
+    template = synth_pipeline_stack(load_test_seconds = 120)
+
+    pipeline = next(iter(template.find_resources("AWS::CodePipeline::Pipeline").values()))
+    stage_names = [stage["Name"] for stage in pipeline["Properties"]["Stages"]]
+    assert stage_names.index("Deploy-Test") < stage_names.index("Performance-Gate") < stage_names.index("Deploy-Production")
+    assert stage_names[-1] == "Record-Perf-Baseline"
+
+    template.has_resource_properties("AWS::CodeBuild::Project", {
+        "Environment": assertions.Match.object_like({
+            "EnvironmentVariables": assertions.Match.array_with([
+                assertions.Match.object_like({"Name": "TEST_ALB_DNS"}),
+                {"Name": "LOAD_DURATION", "Type": "PLAINTEXT", "Value": "120"},
+                {"Name": "RUNS_PREFIX", "Type": "PLAINTEXT", "Value": "perf/runs"}
+            ])
+        })
+    })
+    template.has_resource_properties("AWS::S3::Bucket", {
+        "LifecycleConfiguration": {
+            "Rules": [assertions.Match.object_like({"Prefix": "perf/runs/", "ExpirationInDays": 90})]
+        }
+    })
+    template.has_resource_properties("AWS::IAM::Policy", {
+        "PolicyDocument": {
+            "Statement": assertions.Match.array_with([
+                assertions.Match.object_like({
+                    "Action": assertions.Match.array_with(["s3:PutObject"]),
+                    "Resource": {"Fn::Join": ["", [assertions.Match.any_value(), "/perf/runs/*"]]}
+                })
+            ])
+        }
+    })
+
+
+def test_stage_state_changes_feed_duration_metrics_with_slo_alarms():
+    template = synth_pipeline_stack(stage_slo_minutes = {"Build-And-Test": 12}, notification_email = "team@example.com")
+
+    template.resource_count_is("AWS::Events::Rule", 2)
+    template.has_resource_properties("AWS::Events::Rule", {
+        "EventPattern": assertions.Match.object_like({
+            "source": ["aws.codepipeline"],
+            "detail-type": ["CodePipeline Stage Execution State Change"],
+            "detail": {"state": ["SUCCEEDED", "FAILED"]}
+        })
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "stage_metrics.handler",
+        "Environment": {
+            "Variables": {"METRICS_NAMESPACE": "CICD/Pipeline", "PRODUCTION_STAGE": "Deploy-Production"}
+        }
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "Namespace": "CICD/Pipeline",
+        "MetricName": "StageDuration",
+        "Threshold": 720,
+        "AlarmActions": [assertions.Match.object_like({"Ref": assertions.Match.string_like_regexp("slotopic")})]
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "MetricName": "LeadTime",
+        "Threshold": 24 * 3600
+    })
+    template.has_resource_properties("AWS::SNS::Subscription", {
+        "Protocol": "email",
+        "Endpoint": "team@example.com"
+    })
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from app_cdk.schedule_planner import (
+    load_request_counts,
+    propose_schedule,
+    required_tasks_by_slot,
+    sample_period_minutes,
+)
+
+
+def daily_peak_samples(days = 3, period_minutes = 5):
+    # 1000 requests/minute between 09:00 and 11:00 UTC, 100 otherwise
+    start = datetime(2024, 3, 4, tzinfo = timezone.utc)
+    samples = []
+    for step in range(days * 24 * 60 // period_minutes):
+        timestamp = start + timedelta(minutes = step * period_minutes)
+        per_minute = 1000 if 9 <= timestamp.hour < 11 else 100
+        samples.append((timestamp, per_minute * period_minutes))
+    return samples
+
+
+def test_sample_period_is_inferred():
+    assert sample_period_minutes(daily_peak_samples(period_minutes = 5)) == 5
+
+
+def test_required_tasks_use_per_minute_rate():
+    required = required_tasks_by_slot(daily_peak_samples(), requests_per_task = 250)
+
+    assert required[9 * 60] == 4
+    assert required[12 * 60] == 1
+
+
+def test_schedule_raises_floor_ahead_of_peak_and_lowers_after():
+    schedule = propose_schedule(daily_peak_samples(), requests_per_task = 250, lead_minutes = 15)
+
+    assert schedule == [
+        {'name': 'floor-4-at-0845', 'cron': '45 8 * * ? *', 'min_capacity': 4},
+        {'name': 'floor-1-at-1100', 'cron': '0 11 * * ? *', 'min_capacity': 1},
+    ]
+
+
+def test_schedule_respects_baseline_and_max_capacity():
+    schedule = propose_schedule(daily_peak_samples(), requests_per_task = 250, baseline_capacity = 2, max_capacity = 3)
+
+    assert [entry['min_capacity'] for entry in schedule] == [3, 2]
+
+
+def test_flat_traffic_needs_no_schedule():
+    samples = [(timestamp, 100) for timestamp, _ in daily_peak_samples()]
+
+    assert propose_schedule(samples, requests_per_task = 500) == []
+
+
+def test_load_csv_and_metric_data_json(tmp_path):
+    csv_export = tmp_path / 'requests.csv'
+    csv_export.write_text('timestamp,RequestCount\n2024-03-04T09:05:00Z,20\n2024-03-04T09:00:00Z,10\n')
+    json_export = tmp_path / 'requests.json'
+    json_export.write_text(json.dumps({
+        'MetricDataResults': [{
+            'Timestamps': ['2024-03-04T09:05:00+00:00', '2024-03-04T09:00:00+00:00'],
+            'Values': [20, 10]
+        }]
+    }))
+
+    expected = [
+        (datetime(2024, 3, 4, 9, 0, tzinfo = timezone.utc), 10.0),
+        (datetime(2024, 3, 4, 9, 5, tzinfo = timezone.utc), 20.0),
+    ]
+    assert load_request_counts(str(csv_export)) == expected
+    assert load_request_counts(str(json_export)) == expected
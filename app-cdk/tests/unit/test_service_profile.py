@@ -0,0 +1,89 @@
+import json
+
+import pytest
+import aws_cdk as core
+
+from app_cdk.service_profile import PROFILES_DIRECTORY, ContainerHealthCheckProps, ServiceProfile, load_profile
+
+
+def test_checked_in_profiles_load():
+    app = core.App()
+
+    test_profile = load_profile(app, "test")
+    prod_profile = load_profile(app, "prod")
+
+    assert not test_profile.blue_green
+    assert prod_profile.blue_green
+    assert prod_profile.task_count == prod_profile.scaling.min_capacity
+    assert "FARGATE_SPOT" in [provider.capacity_provider for provider in test_profile.capacity_providers]
+    assert not prod_profile.capacity_providers
+
+
+def test_context_profile_takes_precedence_over_file():
+    app = core.App(context = {
+        "service-profiles": {"test": {"cpu": 1024, "memory_limit_mib": 2048}}
+    })
+
+    profile = load_profile(app, "test")
+
+    assert profile.cpu == 1024
+    assert profile.scaling is None
+
+
+def test_context_profile_may_be_json_string():
+    app = core.App(context = {
+        "service-profiles": json.dumps({"test": {"desired_count": 3}})
+    })
+
+    assert load_profile(app, "test").task_count == 3
+
+
+def test_from_dict_builds_nested_settings():
+    with open(PROFILES_DIRECTORY / "prod.json") as profile_file:
+        data = json.load(profile_file)
+    data["scaling"]["schedules"] = [{"name": "peak", "cron": "45 8 * * ? *", "min_capacity": 4}]
+
+    profile = ServiceProfile.from_dict(data)
+
+    assert profile.health_check.interval_seconds == 11
+    assert profile.scaling.schedules[0].min_capacity == 4
+
+
+def test_container_start_period_is_derived_from_measured_startup():
+    assert ContainerHealthCheckProps().effective_start_period_seconds == 0
+    assert ContainerHealthCheckProps(measured_startup_seconds = 8).effective_start_period_seconds == 12
+    assert ContainerHealthCheckProps(measured_startup_seconds = 400).effective_start_period_seconds == 300
+    assert ContainerHealthCheckProps(start_period_seconds = 20, measured_startup_seconds = 8).effective_start_period_seconds == 20
+
+
+@pytest.mark.parametrize("data", [
+    {"deployment_controller": "EXTERNAL"},
+    {"unknown_setting": 1},
+    {"health_check": {"interval_seconds": 5, "timeout_seconds": 5}},
+    {"desired_count": 20, "scaling": {"min_capacity": 1, "max_capacity": 4}},
+    {"capacity_providers": [{"capacity_provider": "EC2"}]},
+    {"capacity_providers": [
+        {"capacity_provider": "FARGATE", "base": 1},
+        {"capacity_provider": "FARGATE_SPOT", "base": 1}
+    ]},
+    {"stop_timeout_seconds": 180},
+    {"cpu_architecture": "ARM"},
+    {"load_balancer": {"routing_algorithm": "random"}},
+    {"load_balancer": {"slow_start_seconds": 10}},
+    {"load_balancer": {"routing_algorithm": "least_outstanding_requests", "slow_start_seconds": 60}},
+    {"load_balancer": {"idle_timeout_seconds": 120, "target_keep_alive_seconds": 65}},
+    {"container_health_check": {"interval_seconds": 1}},
+    {"container_health_check": {"start_period_seconds": 600}},
+    {"rolling_deployment": {"min_healthy_percent": 100, "max_healthy_percent": 100}},
+    {"deployment_controller": "CODE_DEPLOY", "rolling_deployment": {}},
+    {"container_insights": "ON"},
+    {"deployment_controller": "CODE_DEPLOY", "blue_green_deployment": {"deployment_config": "CANARY_50_PERCENT"}},
+    {"blue_green_deployment": {}},
+    {"logging": {"driver": "syslog"}},
+    {"logging": {"retention": "INFINITE"}},
+    {"logging": {"driver": "firelens", "firelens_buffer_limit_bytes": 0}},
+    {"dashboard": {"period_seconds": 90}},
+])
+def test_invalid_profiles_are_rejected(data):
+    with pytest.raises(ValueError):
+        ServiceProfile.from_dict(data)
@@ -0,0 +1,123 @@
+from app_cdk.pipeline_events.stage_metrics import measurements, metric_data
+
+PIPELINE = "pipeline-stack-CICDPipeline1A2B3C"
+EXECUTION_ID = "0e5b6c2a-7f3d-4e1a-9c8b-2d4f6a8b0c1e"
+
+
+def stage_event(stage, state, time):
+    return {
+        "version": "0",
+        "id": "2f6a8c4e-1b3d-4f5a-8e7c-9a0b1c2d3e4f",
+        "detail-type": "CodePipeline Stage Execution State Change",
+        "source": "aws.codepipeline",
+        "account": "123456789012",
+        "time": time,
+        "region": "us-east-2",
+        "resources": [f"arn:aws:codepipeline:us-east-2:123456789012:{PIPELINE}"],
+        "detail": {"pipeline": PIPELINE, "execution-id": EXECUTION_ID, "stage": stage, "state": state, "version": 4}
+    }
+
+
+def action_event(stage, action, state, time):
+    event = stage_event(stage, state, time)
+    event["detail-type"] = "CodePipeline Action Execution State Change"
+    event["detail"].update({
+        "action": action,
+        "region": "us-east-2",
+        "type": {"owner": "AWS", "provider": "CodeBuild", "category": "Build", "version": "1"}
+    })
+    return event
+
+
+def action_execution(stage, action, started, finished, category = "Build", status = "Succeeded"):
+    return {
+        "pipelineExecutionId": EXECUTION_ID,
+        "stageName": stage,
+        "actionName": action,
+        "startTime": started,
+        "lastUpdateTime": finished,
+        "status": status,
+        "input": {"actionTypeId": {"category": category, "owner": "AWS", "provider": "CodeBuild", "version": "1"}}
+    }
+
+
+# Recorded from aws codepipeline list-action-executions
+ACTION_EXECUTIONS = [
+    action_execution("Source", "GitHub", "2026-10-01T12:00:05+00:00", "2026-10-01T12:00:20+00:00", category = "Source"),
+    action_execution("Build-And-Test", "Unit-Test", "2026-10-01T12:02:00+00:00", "2026-10-01T12:05:30+00:00"),
+    action_execution("Build-And-Test", "Docker-Build", "2026-10-01T12:02:01+00:00", "2026-10-01T12:09:00+00:00"),
+    action_execution("Build-And-Test", "Promote", "2026-10-01T12:09:10+00:00", "2026-10-01T12:10:00+00:00"),
+    action_execution("Deploy-Production", "Approve-Prod-Deploy", "2026-10-01T12:30:00+00:00", "2026-10-01T15:30:00+00:00", category = "Approval"),
+    action_execution("Deploy-Production", "ABlueGreen-deployECS", "2026-10-01T15:30:05+00:00", "2026-10-01T15:45:05+00:00", category = "Deploy"),
+]
+
+# Recorded from aws codepipeline get-pipeline-execution
+PIPELINE_EXECUTION = {
+    "pipelineName": PIPELINE,
+    "pipelineExecutionId": EXECUTION_ID,
+    "status": "InProgress",
+    "artifactRevisions": [
+        {"name": "source_output", "revisionId": "4c1d9e7", "created": "2026-10-01T11:58:00+00:00"}
+    ]
+}
+
+
+def test_stage_duration_spans_parallel_actions():
+    event = stage_event("Build-And-Test", "SUCCEEDED", "2026-10-01T12:10:01Z")
+
+    assert measurements(event, ACTION_EXECUTIONS) == [
+        ("StageDuration", {"Pipeline": PIPELINE, "Stage": "Build-And-Test"}, 480.0)
+    ]
+
+
+def test_action_duration_uses_the_latest_attempt():
+    retried = ACTION_EXECUTIONS + [
+        action_execution("Build-And-Test", "Unit-Test", "2026-10-01T12:20:00+00:00", "2026-10-01T12:21:00+00:00")
+    ]
+    event = action_event("Build-And-Test", "Unit-Test", "SUCCEEDED", "2026-10-01T12:21:00Z")
+
+    assert measurements(event, retried) == [
+        ("ActionDuration", {"Pipeline": PIPELINE, "Stage": "Build-And-Test", "Action": "Unit-Test"}, 60.0)
+    ]
+
+
+def test_manual_approval_is_excluded_from_stage_duration_but_not_lead_time():
+    event = stage_event("Deploy-Production", "SUCCEEDED", "2026-10-01T15:45:05Z")
+
+    results = dict((name, seconds) for name, _, seconds in
+                   measurements(event, ACTION_EXECUTIONS, PIPELINE_EXECUTION, production_stage = "Deploy-Production"))
+
+    assert results["StageDuration"] == 900.0
+    assert results["LeadTime"] == 3 * 3600 + 47 * 60 + 5
+
+
+def test_lead_time_falls_back_to_the_execution_start():
+    event = stage_event("Deploy-Production", "SUCCEEDED", "2026-10-01T15:45:05Z")
+
+    results = measurements(event, ACTION_EXECUTIONS, {"artifactRevisions": []}, production_stage = "Deploy-Production")
+
+    assert results[-1] == ("LeadTime", {"Pipeline": PIPELINE}, 3 * 3600 + 45 * 60)
+
+
+def test_lead_time_is_only_reported_for_a_successful_production_stage():
+    failed = stage_event("Deploy-Production", "FAILED", "2026-10-01T15:45:05Z")
+    earlier = stage_event("Build-And-Test", "SUCCEEDED", "2026-10-01T12:10:01Z")
+
+    for event in (failed, earlier):
+        names = [name for name, _, _ in measurements(event, ACTION_EXECUTIONS, PIPELINE_EXECUTION, "Deploy-Production")]
+        assert "LeadTime" not in names
+
+
+def test_unfinished_states_are_ignored():
+    event = stage_event("Build-And-Test", "STARTED", "2026-10-01T12:02:00Z")
+
+    assert measurements(event, ACTION_EXECUTIONS) == []
+
+
+def test_metric_data_is_in_seconds_at_the_event_time():
+    data = metric_data([("StageDuration", {"Pipeline": PIPELINE, "Stage": "Package"}, 42.5)], "2026-10-01T12:01:00Z")
+
+    assert data[0]["MetricName"] == "StageDuration"
+    assert data[0]["Unit"] == "Seconds" and data[0]["Value"] == 42.5
+    assert data[0]["Dimensions"] == [{"Name": "Pipeline", "Value": PIPELINE}, {"Name": "Stage", "Value": "Package"}]
+    assert data[0]["Timestamp"].isoformat() == "2026-10-01T12:01:00+00:00"
\ No newline at end of file
@@ -1,15 +1,24 @@
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, make_response, request
 import datetime
+import os
 app = Flask(__name__)
 
+# How long browsers and the CloudFront edge may serve the page before revalidating
+PAGE_MAX_AGE = int(os.environ.get('PAGE_MAX_AGE', '60'))
+
 @app.route('/')
 def sample_page():
     year = datetime.datetime.now().year
-    return render_template('index.html', year=year)
+    response = make_response(render_template('index.html', year=year))
+    response.headers['Cache-Control'] = f'public, max-age={PAGE_MAX_AGE}'
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route('/healthcheck')
 def health_check():
-    return jsonify({'health_status': 'OK'})
+    response = jsonify({'health_status': 'OK'})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 if __name__ =='__main__':
     app.run(host='0.0.0.0', port=8081)
\ No newline at end of file
@@ -0,0 +1,24 @@
+import logging
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8081')}"
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# On SIGTERM (task stop or Fargate Spot interruption) stop accepting new
+# connections and give in-flight requests this long to complete.
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '25'))
+
+accesslog = '-'
+
+# Idle keep-alive must outlast the load balancer idle timeout so that the
+# ALB is always the side that closes idle connections.
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '65'))
+
+
+def when_ready(server):
+    # Runs once in the master process, so each task logs its image pull time once
+    from task_metadata import log_image_pull_duration
+    logging.basicConfig(level=logging.INFO)
+    log_image_pull_duration()
@@ -0,0 +1,57 @@
+import json
+import logging
+import os
+import re
+import urllib.request
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+METADATA_URI_VARIABLE = 'ECS_CONTAINER_METADATA_URI_V4'
+
+
+def parse_metadata_timestamp(value):
+    # Task metadata timestamps carry up to nanoseconds, e.g. 2024-03-04T09:00:01.123456789Z,
+    # and Python 3.9's datetime.fromisoformat only reads 3 or 6 fractional digits;
+    # normalize the fraction to microseconds.
+    value = re.sub(r'\.(\d+)', lambda match: '.' + match.group(1)[:6].ljust(6, '0'), value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def image_pull_seconds(task_metadata):
+    started = task_metadata.get('PullStartedAt')
+    stopped = task_metadata.get('PullStoppedAt')
+    if not started or not stopped:
+        return None
+    return (parse_metadata_timestamp(stopped) - parse_metadata_timestamp(started)).total_seconds()
+
+
+def fetch_task_metadata(timeout=1):
+    metadata_uri = os.environ.get(METADATA_URI_VARIABLE)
+    if not metadata_uri:
+        return None
+    with urllib.request.urlopen(f'{metadata_uri}/task', timeout=timeout) as response:
+        return json.load(response)
+
+
+def log_image_pull_duration():
+    """Log how long Fargate spent pulling the task's images, once per task."""
+    try:
+        task_metadata = fetch_task_metadata()
+        if task_metadata is None:
+            return None
+        seconds = image_pull_seconds(task_metadata)
+    except (OSError, ValueError):
+        # Runs in gunicorn's when_ready hook, where an exception stops the master
+        logger.warning('task metadata unavailable or unreadable, image pull duration not recorded')
+        return None
+
+    if seconds is not None:
+        logger.info(
+            'image_pull_seconds=%.3f pull_started_at=%s pull_stopped_at=%s task=%s',
+            seconds,
+            task_metadata['PullStartedAt'],
+            task_metadata['PullStoppedAt'],
+            task_metadata.get('TaskARN')
+        )
+    return seconds
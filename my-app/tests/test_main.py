@@ -18,4 +18,18 @@ def test_health_status_code(app, client):
 
 def test_main_status_code(app, client):
     res = client.get('/')
-    assert res.status_code == 200
\ No newline at end of file
+    assert res.status_code == 200
+
+def test_main_is_cacheable_with_etag(app, client):
+    res = client.get('/')
+    assert res.headers['Cache-Control'].startswith('public, max-age=')
+    assert res.headers['ETag']
+
+def test_main_revalidates_with_etag(app, client):
+    etag = client.get('/').headers['ETag']
+    res = client.get('/', headers={'If-None-Match': etag})
+    assert res.status_code == 304
+
+def test_health_check_is_not_cached(app, client):
+    res = client.get('/healthcheck')
+    assert res.headers['Cache-Control'] == 'no-store'
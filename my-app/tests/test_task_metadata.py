@@ -0,0 +1,59 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from task_metadata import image_pull_seconds, log_image_pull_duration, parse_metadata_timestamp
+
+TASK_METADATA = {
+    'TaskARN': 'arn:aws:ecs:us-east-2:111122223333:task/cluster/0123456789abcdef',
+    'PullStartedAt': '2024-03-04T09:00:01.250000000Z',
+    'PullStoppedAt': '2024-03-04T09:00:13.750123456Z'
+}
+
+@pytest.fixture
+def metadata_endpoint(monkeypatch):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(TASK_METADATA).encode()
+            self.send_response(200 if self.path == '/v4/task' else 404)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('ECS_CONTAINER_METADATA_URI_V4', f'http://127.0.0.1:{server.server_address[1]}/v4')
+    yield
+    server.shutdown()
+
+def test_parse_nanosecond_timestamp():
+    assert parse_metadata_timestamp('2024-03-04T09:00:01.123456789Z').microsecond == 123456
+
+@pytest.mark.parametrize('value, microsecond', [
+    ('2024-03-04T09:00:01.12Z', 120000),
+    ('2024-03-04T09:00:01.1234Z', 123400),
+    ('2024-03-04T09:00:01.1234567Z', 123456),
+    ('2024-03-04T09:00:01Z', 0),
+])
+def test_parse_timestamp_normalizes_fraction(value, microsecond):
+    assert parse_metadata_timestamp(value).microsecond == microsecond
+
+def test_image_pull_seconds():
+    assert image_pull_seconds(TASK_METADATA) == pytest.approx(12.500123)
+
+def test_image_pull_seconds_without_pull_timestamps():
+    assert image_pull_seconds({'TaskARN': 'arn'}) is None
+
+def test_log_image_pull_duration_reads_task_metadata(metadata_endpoint):
+    assert log_image_pull_duration() == pytest.approx(12.500123)
+
+def test_log_image_pull_duration_outside_ecs(monkeypatch):
+    monkeypatch.delenv('ECS_CONTAINER_METADATA_URI_V4', raising=False)
+    assert log_image_pull_duration() is None
+
+def test_log_image_pull_duration_survives_unreadable_timestamps(metadata_endpoint, monkeypatch):
+    monkeypatch.setitem(TASK_METADATA, 'PullStoppedAt', 'not a timestamp')
+    assert log_image_pull_duration() is None
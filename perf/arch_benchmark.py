@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Compare requests/sec per vCPU of the x86_64 and ARM64 (Graviton) services.
+
+Runs the same closed-loop load against both load balancers and normalises
+throughput by the vCPUs serving it (task count x task vCPU, 512 CPU units
+being 0.5 vCPU).
+
+Usage:
+  python perf/arch_benchmark.py \\
+      --x86-url http://x86-alb.example.com/ --arm-url http://arm-alb.example.com/ \\
+      --task-cpu 512 --tasks 2 --duration 120 --concurrency 32
+"""
+import argparse
+import json
+
+from loadgen import run_load
+
+
+def requests_per_vcpu(report, task_cpu_units, tasks):
+    vcpus = task_cpu_units / 1024 * tasks
+    return round(report['requests_per_second'] / vcpus, 2)
+
+
+def compare(x86_report, arm_report, task_cpu_units, tasks):
+    x86_per_vcpu = requests_per_vcpu(x86_report, task_cpu_units, tasks)
+    arm_per_vcpu = requests_per_vcpu(arm_report, task_cpu_units, tasks)
+    return {
+        'x86_64': dict(x86_report, requests_per_second_per_vcpu = x86_per_vcpu),
+        'arm64': dict(arm_report, requests_per_second_per_vcpu = arm_per_vcpu),
+        'arm64_to_x86_64_ratio': round(arm_per_vcpu / x86_per_vcpu, 3) if x86_per_vcpu else None,
+    }
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Compare requests/sec per vCPU across CPU architectures.')
+    parser.add_argument('--x86-url', required = True)
+    parser.add_argument('--arm-url', required = True)
+    parser.add_argument('--task-cpu', type = int, default = 512, help = 'task CPU units of both services')
+    parser.add_argument('--tasks', type = int, default = 1, help = 'running tasks behind each load balancer')
+    parser.add_argument('--duration', type = float, default = 60)
+    parser.add_argument('--concurrency', type = int, default = 16)
+    args = parser.parse_args(argv)
+
+    x86_report = run_load(args.x86_url, args.duration, args.concurrency)
+    arm_report = run_load(args.arm_url, args.duration, args.concurrency)
+
+    print(json.dumps(compare(x86_report, arm_report, args.task_cpu, args.tasks), indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Compare pipeline artifact sizes and CodeBuild source download times.
+
+Takes two exports of ``aws codebuild batch-get-builds``, one from before and
+one from after a change to the pipeline artifacts, and reports the
+DOWNLOAD_SOURCE phase duration per CodeBuild project. Artifact sizes can
+be given as zip files (downloaded from the artifact bucket) or directories.
+
+Usage:
+  aws codebuild batch-get-builds --ids $(aws codebuild list-builds-for-project \\
+      --project-name <project> --query 'ids[:20]' --output text) > before.json
+  python perf/artifact_report.py before.json after.json \\
+      --before-artifact source.zip --after-artifact app_source.zip
+"""
+import argparse
+import json
+import os
+from statistics import median
+
+
+def download_source_seconds(build):
+    for phase in build.get('phases', []):
+        if phase.get('phaseType') == 'DOWNLOAD_SOURCE' and 'durationInSeconds' in phase:
+            return phase['durationInSeconds']
+    return None
+
+
+def load_builds(path):
+    with open(path) as export:
+        document = json.load(export)
+    if isinstance(document, dict):
+        return document.get('builds', [document])
+    return document
+
+
+def summarize_builds(builds):
+    durations = {}
+    for build in builds:
+        seconds = download_source_seconds(build)
+        if seconds is not None:
+            project = build.get('projectName', 'unknown')
+            durations.setdefault(project, []).append(seconds)
+    return {
+        project: {
+            'builds': len(values),
+            'median_download_source_seconds': median(values),
+            'max_download_source_seconds': max(values),
+        }
+        for project, values in sorted(durations.items())
+    }
+
+
+def artifact_size_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def compare(before, after):
+    comparison = {'before': before, 'after': after, 'download_source_seconds_saved': {}}
+    for project in sorted(set(before) & set(after)):
+        comparison['download_source_seconds_saved'][project] = (
+            before[project]['median_download_source_seconds'] - after[project]['median_download_source_seconds']
+        )
+    return comparison
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Compare artifact sizes and CodeBuild source download times.')
+    parser.add_argument('before', help = 'batch-get-builds export from before the change')
+    parser.add_argument('after', help = 'batch-get-builds export from after the change')
+    parser.add_argument('--before-artifact', help = 'zip file or directory of the old input artifact')
+    parser.add_argument('--after-artifact', help = 'zip file or directory of the new input artifact')
+    args = parser.parse_args(argv)
+
+    report = compare(summarize_builds(load_builds(args.before)), summarize_builds(load_builds(args.after)))
+    if args.before_artifact and args.after_artifact:
+        report['artifact_bytes'] = {
+            'before': artifact_size_bytes(args.before_artifact),
+            'after': artifact_size_bytes(args.after_artifact),
+        }
+    print(json.dumps(report, indent = 2))
+
+
+if __name__ == '__main__':
+    main()
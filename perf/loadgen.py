@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Closed-loop HTTP load generator for my-app.
+
+Each worker thread keeps one persistent connection and issues requests back
+to back for the requested duration. The result reports throughput, error
+rate and latency percentiles in milliseconds.
+
+Usage:
+  python perf/loadgen.py http://my-alb.example.com/ --duration 60 --concurrency 16
+"""
+import argparse
+import http.client
+import json
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms, errors, elapsed_seconds):
+    requests = len(latencies_ms) + errors
+    return {
+        'requests': requests,
+        'errors': errors,
+        'error_rate': errors / requests if requests else 0.0,
+        'duration_seconds': round(elapsed_seconds, 3),
+        'requests_per_second': round(len(latencies_ms) / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+        'p50_ms': percentile(latencies_ms, 0.50),
+        'p90_ms': percentile(latencies_ms, 0.90),
+        'p99_ms': percentile(latencies_ms, 0.99),
+    }
+
+
+def _connect(url, timeout):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    return connection_class(parts.hostname, parts.port, timeout = timeout)
+
+
+def _worker(url, deadline, timeout, latencies_ms, errors, lock):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path = f'{path}?{parts.query}'
+
+    connection = _connect(url, timeout)
+    local_latencies = []
+    local_errors = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                local_errors += 1
+            else:
+                local_latencies.append((time.perf_counter() - started) * 1000)
+            if response.will_close:
+                connection.close()
+                connection = _connect(url, timeout)
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            connection.close()
+            connection = _connect(url, timeout)
+    connection.close()
+
+    with lock:
+        latencies_ms.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def run_load(url, duration_seconds = 30, concurrency = 8, timeout = 10):
+    latencies_ms = []
+    errors = []
+    lock = threading.Lock()
+
+    started = time.monotonic()
+    deadline = started + duration_seconds
+    workers = [
+        threading.Thread(target = _worker, args = (url, deadline, timeout, latencies_ms, errors, lock))
+        for _ in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return summarize(latencies_ms, sum(errors), time.monotonic() - started)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Generate HTTP load and report latency percentiles.')
+    parser.add_argument('url')
+    parser.add_argument('--duration', type = float, default = 30, help = 'seconds to run')
+    parser.add_argument('--concurrency', type = int, default = 8, help = 'parallel connections')
+    parser.add_argument('--timeout', type = float, default = 10, help = 'per-request timeout in seconds')
+    parser.add_argument('--output', help = 'write the JSON report to this file')
+    args = parser.parse_args(argv)
+
+    report = run_load(args.url, args.duration, args.concurrency, args.timeout)
+    report['url'] = args.url
+    report['concurrency'] = args.concurrency
+
+    print(json.dumps(report, indent = 2))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent = 2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Fail the pipeline when a load test regresses against the stored baseline.
+
+Compares a ``loadgen.py`` report with the report of the last build promoted
+to production. p50 and p99 may grow by a relative tolerance, the error rate
+by an absolute one. Without a baseline (the first run) the gate passes and
+only records the report.
+
+Usage:
+  python perf/perf_gate.py perf-report.json --baseline baseline.json --output perf-gate.json
+"""
+import argparse
+import json
+import os
+import sys
+
+DEFAULT_TOLERANCES = {
+    'p50_ms': 0.20,
+    'p99_ms': 0.30,
+    'error_rate': 0.01,
+}
+
+
+def find_regressions(report, baseline, tolerances = None):
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    regressions = []
+
+    for metric in ('p50_ms', 'p99_ms'):
+        current, previous = report.get(metric), baseline.get(metric)
+        if current is None or previous is None:
+            continue
+        limit = previous * (1 + tolerances[metric])
+        if current > limit:
+            regressions.append({'metric': metric, 'baseline': previous, 'current': current, 'limit': round(limit, 3)})
+
+    limit = baseline.get('error_rate', 0.0) + tolerances['error_rate']
+    if report.get('error_rate', 0.0) > limit:
+        regressions.append({
+            'metric': 'error_rate',
+            'baseline': baseline.get('error_rate', 0.0),
+            'current': report['error_rate'],
+            'limit': round(limit, 6),
+        })
+
+    if not report.get('requests'):
+        regressions.append({'metric': 'requests', 'baseline': baseline.get('requests'), 'current': 0, 'limit': 1})
+
+    return regressions
+
+
+def evaluate(report, baseline = None, tolerances = None):
+    if baseline is None:
+        return {'passed': True, 'baseline': None, 'report': report, 'regressions': []}
+    regressions = find_regressions(report, baseline, tolerances)
+    return {'passed': not regressions, 'baseline': baseline, 'report': report, 'regressions': regressions}
+
+
+def _load_json(path):
+    with open(path) as document:
+        return json.load(document)
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Compare a load test report with the production baseline.')
+    parser.add_argument('report', help = 'loadgen.py JSON report for this build')
+    parser.add_argument('--baseline', help = 'report of the last promoted build; skipped if missing')
+    parser.add_argument('--output', help = 'write the gate result to this file')
+    parser.add_argument('--p50-tolerance', type = float, default = DEFAULT_TOLERANCES['p50_ms'],
+                        help = 'allowed relative p50 increase')
+    parser.add_argument('--p99-tolerance', type = float, default = DEFAULT_TOLERANCES['p99_ms'],
+                        help = 'allowed relative p99 increase')
+    parser.add_argument('--error-rate-tolerance', type = float, default = DEFAULT_TOLERANCES['error_rate'],
+                        help = 'allowed absolute error rate increase')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        baseline = _load_json(args.baseline)
+
+    result = evaluate(_load_json(args.report), baseline, {
+        'p50_ms': args.p50_tolerance,
+        'p99_ms': args.p99_tolerance,
+        'error_rate': args.error_rate_tolerance,
+    })
+
+    print(json.dumps(result, indent = 2))
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent = 2)
+    return 0 if result['passed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Compare Fargate task startup with and without a SOCI lazy-loading index.
+
+Takes two sets of task timestamps, one per image variant, each either the
+output of ``aws ecs describe-tasks`` or a list of ECS task metadata
+documents (``$ECS_CONTAINER_METADATA_URI_V4/task``), and reports image pull
+time and time-to-healthy for both.
+
+Time-to-healthy is measured from task creation (or, in task metadata, which
+has no task creation time, from the start of the image pull) to container
+start, plus the time the load balancer needs to see the task healthy
+(``--health-check-seconds``, healthy threshold x interval).
+
+Usage:
+  aws ecs describe-tasks --cluster <cluster> --tasks <arns...> > without-index.json
+  python perf/startup_benchmark.py without-index.json with-index.json --health-check-seconds 22
+"""
+import argparse
+import json
+import re
+from datetime import datetime, timezone
+from statistics import median
+
+# describe-tasks fields and their task metadata equivalents
+FIELDS = {
+    'created': ('createdAt', 'CreatedAt'),
+    'pull_started': ('pullStartedAt', 'PullStartedAt'),
+    'pull_stopped': ('pullStoppedAt', 'PullStoppedAt'),
+    'started': ('startedAt', 'StartedAt'),
+}
+
+
+def parse_timestamp(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz = timezone.utc)
+    # fromisoformat only reads 3 or 6 fractional digits before Python 3.11
+    value = re.sub(r'\.(\d+)', lambda match: '.' + match.group(1)[:6].ljust(6, '0'), value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _field(task, name):
+    for key in FIELDS[name]:
+        if task.get(key):
+            return parse_timestamp(task[key])
+    if name != 'started':
+        return None
+    # Task metadata only carries start times per container. Container creation
+    # comes after the image pull, so it never stands in for task creation.
+    containers = task.get('Containers') or task.get('containers') or []
+    values = [container.get(key) for container in containers for key in FIELDS[name] if container.get(key)]
+    if values:
+        return min(parse_timestamp(value) for value in values)
+    return None
+
+
+def task_timings(task, health_check_seconds = 0):
+    created = _field(task, 'created')
+    pull_started = _field(task, 'pull_started')
+    pull_stopped = _field(task, 'pull_stopped')
+    started = _field(task, 'started')
+    launched = created or pull_started
+    if launched is None or started is None:
+        return None
+
+    timings = {'time_to_healthy_seconds': (started - launched).total_seconds() + health_check_seconds}
+    if pull_started and pull_stopped:
+        timings['pull_seconds'] = (pull_stopped - pull_started).total_seconds()
+    return timings
+
+
+def load_tasks(path):
+    with open(path) as export:
+        document = json.load(export)
+    if isinstance(document, dict):
+        return document.get('tasks', [document])
+    return document
+
+
+def summarize(tasks, health_check_seconds = 0):
+    timings = [timing for timing in (task_timings(task, health_check_seconds) for task in tasks) if timing]
+    summary = {'tasks': len(timings)}
+    for metric in ('pull_seconds', 'time_to_healthy_seconds'):
+        values = [timing[metric] for timing in timings if metric in timing]
+        if values:
+            summary[f'median_{metric}'] = round(median(values), 3)
+            summary[f'max_{metric}'] = round(max(values), 3)
+    return summary
+
+
+def compare(without_index, with_index):
+    comparison = {'without_index': without_index, 'with_index': with_index}
+    for metric in ('median_pull_seconds', 'median_time_to_healthy_seconds'):
+        if metric in without_index and metric in with_index:
+            comparison[f'{metric}_saved'] = round(without_index[metric] - with_index[metric], 3)
+    return comparison
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = 'Compare task startup with and without a SOCI index.')
+    parser.add_argument('without_index', help = 'task timestamps for the image without an index')
+    parser.add_argument('with_index', help = 'task timestamps for the image with an index')
+    parser.add_argument('--health-check-seconds', type = float, default = 0,
+                        help = 'healthy threshold count x health check interval of the target group')
+    args = parser.parse_args(argv)
+
+    print(json.dumps(compare(
+        summarize(load_tasks(args.without_index), args.health_check_seconds),
+        summarize(load_tasks(args.with_index), args.health_check_seconds),
+    ), indent = 2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import json
+
+from artifact_report import artifact_size_bytes, compare, download_source_seconds, load_builds, summarize_builds
+
+
+def build(project, download_seconds):
+    return {
+        'projectName': project,
+        'phases': [
+            {'phaseType': 'SUBMITTED', 'durationInSeconds': 0},
+            {'phaseType': 'DOWNLOAD_SOURCE', 'durationInSeconds': download_seconds},
+            {'phaseType': 'BUILD', 'durationInSeconds': 40},
+            {'phaseType': 'COMPLETED'},
+        ]
+    }
+
+
+def test_download_source_seconds():
+    assert download_source_seconds(build('Docker-Build', 7)) == 7
+    assert download_source_seconds({'phases': [{'phaseType': 'SUBMITTED'}]}) is None
+
+
+def test_summary_and_comparison_per_project():
+    before = summarize_builds([build('Docker-Build', 8), build('Docker-Build', 6), build('Unit-Test', 5)])
+    after = summarize_builds([build('Docker-Build', 2), build('Unit-Test', 1)])
+
+    report = compare(before, after)
+
+    assert before['Docker-Build'] == {
+        'builds': 2,
+        'median_download_source_seconds': 7.0,
+        'max_download_source_seconds': 8,
+    }
+    assert report['download_source_seconds_saved'] == {'Docker-Build': 5.0, 'Unit-Test': 4}
+
+
+def test_load_builds_and_artifact_sizes(tmp_path):
+    export = tmp_path / 'builds.json'
+    export.write_text(json.dumps({'builds': [build('Unit-Test', 3)], 'buildsNotFound': []}))
+    (tmp_path / 'artifact').mkdir()
+    (tmp_path / 'artifact' / 'app.py').write_bytes(b'x' * 100)
+    (tmp_path / 'artifact.zip').write_bytes(b'x' * 40)
+
+    assert len(load_builds(export)) == 1
+    assert artifact_size_bytes(tmp_path / 'artifact') == 100
+    assert artifact_size_bytes(tmp_path / 'artifact.zip') == 40
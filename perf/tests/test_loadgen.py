@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from arch_benchmark import compare, requests_per_vcpu
+from loadgen import percentile, run_load, summarize
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 500 if self.path == '/error' else 200
+        body = b'ok'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) is None
+
+
+def test_summarize_reports_error_rate_and_throughput():
+    report = summarize([10, 20, 30], errors = 1, elapsed_seconds = 2)
+
+    assert report['requests'] == 4
+    assert report['error_rate'] == 0.25
+    assert report['requests_per_second'] == 1.5
+    assert report['p50_ms'] == 20
+
+
+def test_run_load_against_local_server(server_url):
+    report = run_load(server_url + '/', duration_seconds = 0.3, concurrency = 2)
+
+    assert report['requests'] > 0
+    assert report['errors'] == 0
+    assert report['p99_ms'] is not None
+
+
+def test_server_errors_are_counted(server_url):
+    report = run_load(server_url + '/error', duration_seconds = 0.2, concurrency = 1)
+
+    assert report['error_rate'] == 1.0
+
+
+def test_compare_normalises_by_vcpu():
+    x86 = {'requests_per_second': 100.0}
+    arm = {'requests_per_second': 120.0}
+
+    assert requests_per_vcpu(x86, task_cpu_units = 512, tasks = 2) == 100.0
+    assert compare(x86, arm, task_cpu_units = 512, tasks = 2)['arm64_to_x86_64_ratio'] == 1.2
@@ -0,0 +1,46 @@
+import json
+
+from perf_gate import evaluate, find_regressions, main
+
+BASELINE = {'requests': 1000, 'errors': 0, 'error_rate': 0.0, 'p50_ms': 10.0, 'p99_ms': 50.0}
+
+
+def report(**overrides):
+    return {**BASELINE, **overrides}
+
+
+def test_within_tolerance_passes():
+    assert find_regressions(report(p50_ms = 11.9, p99_ms = 64.0, error_rate = 0.005), BASELINE) == []
+
+
+def test_latency_and_error_regressions_are_reported():
+    regressions = find_regressions(report(p50_ms = 12.5, p99_ms = 80.0, error_rate = 0.02), BASELINE)
+
+    assert [regression['metric'] for regression in regressions] == ['p50_ms', 'p99_ms', 'error_rate']
+    assert regressions[0]['limit'] == 12.0
+
+
+def test_tolerances_can_be_overridden():
+    assert find_regressions(report(p99_ms = 80.0), BASELINE, {'p99_ms': 0.7}) == []
+
+
+def test_run_without_successful_requests_fails():
+    assert not evaluate(report(requests = 0, p50_ms = None, p99_ms = None), BASELINE)['passed']
+
+
+def test_first_run_without_baseline_passes(tmp_path):
+    report_path = tmp_path / 'perf-report.json'
+    report_path.write_text(json.dumps(report(p99_ms = 500.0)))
+    output = tmp_path / 'perf-gate.json'
+
+    assert main([str(report_path), '--baseline', str(tmp_path / 'missing.json'), '--output', str(output)]) == 0
+    assert json.loads(output.read_text())['baseline'] is None
+
+
+def test_regression_exits_non_zero(tmp_path):
+    report_path = tmp_path / 'perf-report.json'
+    report_path.write_text(json.dumps(report(p99_ms = 500.0)))
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(json.dumps(BASELINE))
+
+    assert main([str(report_path), '--baseline', str(baseline_path)]) == 1
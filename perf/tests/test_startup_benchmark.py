@@ -0,0 +1,52 @@
+import json
+
+from startup_benchmark import compare, load_tasks, summarize, task_timings
+
+
+def describe_tasks_entry(pull_seconds, start_seconds):
+    return {
+        'createdAt': '2024-03-04T09:00:00+00:00',
+        'pullStartedAt': '2024-03-04T09:00:02+00:00',
+        'pullStoppedAt': f'2024-03-04T09:00:{2 + pull_seconds:02d}+00:00',
+        'startedAt': f'2024-03-04T09:00:{start_seconds:02d}+00:00',
+    }
+
+
+def test_task_timings_from_describe_tasks():
+    timings = task_timings(describe_tasks_entry(10, 15), health_check_seconds = 22)
+
+    assert timings == {'pull_seconds': 10.0, 'time_to_healthy_seconds': 37.0}
+
+
+def test_task_timings_from_task_metadata():
+    metadata = {
+        'PullStartedAt': '2024-03-04T09:00:02.000000000Z',
+        'PullStoppedAt': '2024-03-04T09:00:05.500000000Z',
+        'Containers': [
+            {'CreatedAt': '2024-03-04T09:00:05.600000000Z', 'StartedAt': '2024-03-04T09:00:06.100000000Z'},
+            {'CreatedAt': '2024-03-04T09:00:05.700000000Z', 'StartedAt': '2024-03-04T09:00:06.000000000Z'},
+        ]
+    }
+
+    timings = task_timings(metadata)
+
+    assert timings['pull_seconds'] == 3.5
+    # From the start of the pull to the first container start
+    assert timings['time_to_healthy_seconds'] == 4.0
+
+
+def test_tasks_without_start_time_are_skipped():
+    assert task_timings({'createdAt': '2024-03-04T09:00:00+00:00'}) is None
+
+
+def test_compare_reports_time_saved(tmp_path):
+    without_index = tmp_path / 'without.json'
+    without_index.write_text(json.dumps({'tasks': [describe_tasks_entry(20, 25), describe_tasks_entry(24, 29)]}))
+    with_index = tmp_path / 'with.json'
+    with_index.write_text(json.dumps([describe_tasks_entry(4, 9)]))
+
+    comparison = compare(summarize(load_tasks(str(without_index))), summarize(load_tasks(str(with_index))))
+
+    assert comparison['without_index']['tasks'] == 2
+    assert comparison['median_pull_seconds_saved'] == 18.0
+    assert comparison['median_time_to_healthy_seconds_saved'] == 18.0